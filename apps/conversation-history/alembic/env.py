@@ -8,7 +8,7 @@ from sqlalchemy import pool
 from sqlalchemy.engine import Connection
 from sqlalchemy.ext.asyncio import async_engine_from_config
 
-from conversation_history.config import settings
+from conversation_history.config import get_settings
 from conversation_history.db.models import Base
 
 config = context.config
@@ -21,7 +21,7 @@ target_metadata = Base.metadata
 
 def get_url():
     """Get database URL from settings."""
-    return settings.sync_database_url
+    return get_settings().sync_database_url
 
 
 def run_migrations_offline() -> None:
@@ -49,7 +49,7 @@ def do_run_migrations(connection: Connection) -> None:
 async def run_async_migrations() -> None:
     """Run migrations in 'online' mode with async engine."""
     configuration = config.get_section(config.config_ini_section)
-    configuration["sqlalchemy.url"] = settings.async_database_url
+    configuration["sqlalchemy.url"] = get_settings().async_database_url
     connectable = async_engine_from_config(
         configuration,
         prefix="sqlalchemy.",
@@ -0,0 +1,54 @@
+"""Store embeddings as halfvec and add HNSW index on conversations
+
+Revision ID: 003_halfvec_embeddings
+Revises: 002_add_source_id
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '003_halfvec_embeddings'
+down_revision: Union[str, None] = '002_add_source_id'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # halfvec (pgvector >= 0.7) stores 2 bytes/dim instead of 4
+    op.execute(
+        'ALTER TABLE conversations '
+        'ALTER COLUMN embedding TYPE halfvec(1536) USING embedding::halfvec(1536)'
+    )
+    op.execute(
+        'ALTER TABLE conversation_chunks '
+        'ALTER COLUMN embedding TYPE halfvec(1536) USING embedding::halfvec(1536)'
+    )
+
+    # Build the ANN index outside the migration transaction so writes
+    # are not blocked while the graph is constructed
+    with op.get_context().autocommit_block():
+        op.execute("SET maintenance_work_mem = '2GB'")
+        op.execute(
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_conversations_embedding_hnsw '
+            'ON conversations USING hnsw (embedding halfvec_cosine_ops) '
+            'WITH (m = 16, ef_construction = 64)'
+        )
+        op.execute('RESET maintenance_work_mem')
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS ix_conversations_embedding_hnsw')
+
+    op.execute(
+        'ALTER TABLE conversation_chunks '
+        'ALTER COLUMN embedding TYPE vector(1536) USING embedding::vector(1536)'
+    )
+    op.execute(
+        'ALTER TABLE conversations '
+        'ALTER COLUMN embedding TYPE vector(1536) USING embedding::vector(1536)'
+    )
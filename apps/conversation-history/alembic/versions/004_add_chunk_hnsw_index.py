@@ -0,0 +1,33 @@
+"""Add HNSW index on conversation_chunks embeddings
+
+Revision ID: 004_add_chunk_hnsw_index
+Revises: 003_halfvec_embeddings
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '004_add_chunk_hnsw_index'
+down_revision: Union[str, None] = '003_halfvec_embeddings'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("SET maintenance_work_mem = '2GB'")
+        op.execute(
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_chunks_embedding_hnsw '
+            'ON conversation_chunks USING hnsw (embedding halfvec_cosine_ops) '
+            'WITH (m = 16, ef_construction = 64)'
+        )
+        op.execute('RESET maintenance_work_mem')
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS ix_chunks_embedding_hnsw')
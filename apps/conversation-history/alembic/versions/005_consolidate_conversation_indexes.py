@@ -0,0 +1,49 @@
+"""Consolidate single-column conversation indexes
+
+Revision ID: 005_consolidate_indexes
+Revises: 004_add_chunk_hnsw_index
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '005_consolidate_indexes'
+down_revision: Union[str, None] = '004_add_chunk_hnsw_index'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        # Queries filter by project first, so a composite index serves both
+        # project-only and project+feature lookups
+        op.execute(
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_conversations_project_feature '
+            'ON conversations (project_name, feature_name)'
+        )
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS ix_conversations_project_name')
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS ix_conversations_feature_name')
+        # Dedup goes through the unique file_path index; content_hash is only
+        # compared after that row is found, never searched on its own
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS ix_conversations_content_hash')
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute(
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_conversations_content_hash '
+            'ON conversations (content_hash)'
+        )
+        op.execute(
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_conversations_feature_name '
+            'ON conversations (feature_name)'
+        )
+        op.execute(
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_conversations_project_name '
+            'ON conversations (project_name)'
+        )
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS ix_conversations_project_feature')
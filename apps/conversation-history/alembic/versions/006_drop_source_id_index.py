@@ -0,0 +1,32 @@
+"""Drop the unused source_id index
+
+Revision ID: 006_drop_source_id_index
+Revises: 005_consolidate_indexes
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '006_drop_source_id_index'
+down_revision: Union[str, None] = '005_consolidate_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Imports dedup through the upsert on file_path; nothing looks rows up
+    # by source_id, so its index only costs writes
+    with op.get_context().autocommit_block():
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS ix_conversations_source_id')
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute(
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_conversations_source_id '
+            'ON conversations (source_id)'
+        )
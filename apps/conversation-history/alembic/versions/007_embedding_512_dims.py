@@ -0,0 +1,40 @@
+"""Shrink embeddings to 512 dimensions for text-embedding-3-small
+
+Revision ID: 007_embedding_512_dims
+Revises: 006_drop_source_id_index
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '007_embedding_512_dims'
+down_revision: Union[str, None] = '006_drop_source_id_index'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _set_embedding_dims(dims: int) -> None:
+    # Vectors from a different model/dimension can't be converted, so clear
+    # them; the indexer re-embeds every conversation whose embedding is NULL
+    # and rebuilds its chunks along the way
+    op.execute('DELETE FROM conversation_chunks')
+    op.execute(
+        'ALTER TABLE conversation_chunks '
+        f'ALTER COLUMN embedding TYPE halfvec({dims}) USING NULL'
+    )
+    op.execute(
+        'ALTER TABLE conversations '
+        f'ALTER COLUMN embedding TYPE halfvec({dims}) USING NULL'
+    )
+
+
+def upgrade() -> None:
+    _set_embedding_dims(512)
+
+
+def downgrade() -> None:
+    _set_embedding_dims(1536)
@@ -0,0 +1,41 @@
+"""Index chunk content hashes for embedding reuse
+
+Revision ID: 008_add_content_hash_lookups
+Revises: 007_embedding_512_dims
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '008_add_content_hash_lookups'
+down_revision: Union[str, None] = '007_embedding_512_dims'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing chunks keep a NULL hash; they are rehashed on their next re-embed
+    op.add_column(
+        'conversation_chunks',
+        sa.Column('content_hash', sa.String(32), nullable=True),
+    )
+
+    # Conversation-level reuse matches on embedding_hash (revision 010), so
+    # conversations.content_hash stays unindexed
+    with op.get_context().autocommit_block():
+        op.execute(
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_chunks_content_hash '
+            'ON conversation_chunks (content_hash)'
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS ix_chunks_content_hash')
+
+    op.drop_column('conversation_chunks', 'content_hash')
@@ -0,0 +1,31 @@
+"""Add partial index over conversations awaiting an embedding
+
+Revision ID: 009_add_pending_embed_index
+Revises: 008_add_content_hash_lookups
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '009_add_pending_embed_index'
+down_revision: Union[str, None] = '008_add_content_hash_lookups'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Stays as small as the backlog, so finding pending rows is O(pending)
+    with op.get_context().autocommit_block():
+        op.execute(
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_conversations_pending_embed '
+            'ON conversations (id) WHERE embedding IS NULL'
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS ix_conversations_pending_embed')
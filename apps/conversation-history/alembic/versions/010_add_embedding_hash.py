@@ -0,0 +1,40 @@
+"""Track the hash of each conversation's embedded content prefix
+
+Revision ID: 010_add_embedding_hash
+Revises: 009_add_pending_embed_index
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '010_add_embedding_hash'
+down_revision: Union[str, None] = '009_add_pending_embed_index'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing rows keep a NULL hash until their next embedding write
+    op.add_column(
+        'conversations',
+        sa.Column('embedding_hash', sa.String(32), nullable=True),
+    )
+
+    # Embedding reuse looks up stored embeddings by embedding_hash
+    with op.get_context().autocommit_block():
+        op.execute(
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_conversations_embedding_hash '
+            'ON conversations (embedding_hash)'
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS ix_conversations_embedding_hash')
+
+    op.drop_column('conversations', 'embedding_hash')
@@ -0,0 +1,44 @@
+"""Index browse listings by recency
+
+Revision ID: 011_add_browse_indexes
+Revises: 010_add_embedding_hash
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '011_add_browse_indexes'
+down_revision: Union[str, None] = '010_add_embedding_hash'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        # list_checkpoints / list_by_type filter on doc_type and read newest
+        # first, so both the filter and the sort come from the index. It
+        # also serves doc_type-only lookups, replacing ix_conversations_doc_type
+        op.execute(
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_conversations_doc_type_indexed '
+            'ON conversations (doc_type, indexed_at DESC)'
+        )
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS ix_conversations_doc_type')
+        # The same listings narrowed to one project
+        op.execute(
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_conversations_project_indexed '
+            'ON conversations (project_name, indexed_at DESC)'
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute(
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_conversations_doc_type '
+            'ON conversations (doc_type)'
+        )
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS ix_conversations_project_indexed')
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS ix_conversations_doc_type_indexed')
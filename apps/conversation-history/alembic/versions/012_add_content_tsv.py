@@ -0,0 +1,43 @@
+"""Add generated tsvector column for keyword search
+
+Revision ID: 012_add_content_tsv
+Revises: 011_add_browse_indexes
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '012_add_content_tsv'
+down_revision: Union[str, None] = '011_add_browse_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # keyword_search matches against this instead of ILIKE '%...%' over the
+    # full content. The input is capped so a huge document cannot exceed the
+    # 1 MB tsvector limit and fail its insert
+    op.execute(
+        "ALTER TABLE conversations ADD COLUMN content_tsv tsvector "
+        "GENERATED ALWAYS AS ("
+        "to_tsvector('english'::regconfig, "
+        "coalesce(title, '') || ' ' || left(content, 500000))"
+        ") STORED"
+    )
+
+    with op.get_context().autocommit_block():
+        op.execute(
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_conversations_content_tsv '
+            'ON conversations USING gin (content_tsv)'
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS ix_conversations_content_tsv')
+
+    op.drop_column('conversations', 'content_tsv')
@@ -0,0 +1,45 @@
+"""Add id tiebreaker to browse indexes for keyset paging
+
+Revision ID: 013_add_keyset_tiebreaker
+Revises: 012_add_content_tsv
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '013_add_keyset_tiebreaker'
+down_revision: Union[str, None] = '012_add_content_tsv'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = {
+    'ix_conversations_doc_type_indexed': 'doc_type',
+    'ix_conversations_project_indexed': 'project_name',
+}
+
+
+def _rebuild(columns: str) -> None:
+    # Build the replacement alongside the old index and swap names, so the
+    # listings never run without one
+    with op.get_context().autocommit_block():
+        for name, prefix in INDEXES.items():
+            op.execute(
+                f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {name}_new '
+                f'ON conversations ({prefix}, {columns})'
+            )
+            op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {name}')
+            op.execute(f'ALTER INDEX {name}_new RENAME TO {name}')
+
+
+def upgrade() -> None:
+    # list_checkpoints / list_by_type page on (indexed_at, id); with id in
+    # the index the row-value comparison is a single index range scan
+    _rebuild('indexed_at DESC, id DESC')
+
+
+def downgrade() -> None:
+    _rebuild('indexed_at DESC')
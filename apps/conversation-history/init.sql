@@ -11,7 +11,11 @@ CREATE TABLE IF NOT EXISTS conversations (
     title VARCHAR(500),
     content TEXT NOT NULL,
     content_hash VARCHAR(64) NOT NULL,
-    embedding vector(1536),
+    embedding_hash VARCHAR(32),
+    content_tsv tsvector GENERATED ALWAYS AS (
+        to_tsvector('english'::regconfig, coalesce(title, '') || ' ' || left(content, 500000))
+    ) STORED,
+    embedding halfvec(512),
     indexed_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
@@ -21,7 +25,8 @@ CREATE TABLE IF NOT EXISTS conversation_chunks (
     conversation_id UUID REFERENCES conversations(id) ON DELETE CASCADE,
     chunk_index INTEGER NOT NULL,
     content TEXT NOT NULL,
-    embedding vector(1536)
+    content_hash VARCHAR(32),
+    embedding halfvec(512)
 );
 
 CREATE TABLE IF NOT EXISTS index_status (
@@ -38,13 +43,17 @@ CREATE TABLE IF NOT EXISTS index_status (
 );
 
 -- Create indexes
-CREATE INDEX IF NOT EXISTS ix_conversations_project_name ON conversations(project_name);
-CREATE INDEX IF NOT EXISTS ix_conversations_doc_type ON conversations(doc_type);
-CREATE INDEX IF NOT EXISTS ix_conversations_feature_name ON conversations(feature_name);
-CREATE INDEX IF NOT EXISTS ix_conversations_content_hash ON conversations(content_hash);
+CREATE INDEX IF NOT EXISTS ix_conversations_project_feature ON conversations(project_name, feature_name);
+CREATE INDEX IF NOT EXISTS ix_conversations_doc_type_indexed ON conversations(doc_type, indexed_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS ix_conversations_project_indexed ON conversations(project_name, indexed_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS ix_conversations_content_tsv ON conversations USING gin(content_tsv);
+CREATE INDEX IF NOT EXISTS ix_conversations_embedding_hash ON conversations(embedding_hash);
+CREATE INDEX IF NOT EXISTS ix_conversations_pending_embed ON conversations(id) WHERE embedding IS NULL;
 CREATE INDEX IF NOT EXISTS ix_chunks_conversation_id ON conversation_chunks(conversation_id);
+CREATE INDEX IF NOT EXISTS ix_chunks_content_hash ON conversation_chunks(content_hash);
 
--- Create vector index for similarity search (IVFFlat)
--- Note: Run this after loading some data for better performance
--- CREATE INDEX IF NOT EXISTS ix_conversations_embedding ON conversations
---   USING ivfflat (embedding vector_cosine_ops) WITH (lists = 100);
+-- HNSW vector index for similarity search (halfvec, cosine distance)
+CREATE INDEX IF NOT EXISTS ix_conversations_embedding_hnsw ON conversations
+  USING hnsw (embedding halfvec_cosine_ops) WITH (m = 16, ef_construction = 64);
+CREATE INDEX IF NOT EXISTS ix_chunks_embedding_hnsw ON conversation_chunks
+  USING hnsw (embedding halfvec_cosine_ops) WITH (m = 16, ef_construction = 64);
@@ -0,0 +1,83 @@
+"""In-process TTL cache for read-mostly MCP tools."""
+
+import asyncio
+import functools
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any, ParamSpec, TypeVar
+
+from .config import get_settings
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+# Cleared together whenever indexed data changes
+_caches: list[dict] = []
+
+# Bumped by invalidate_all(); results computed across a bump are not stored
+_generation = 0
+
+# Cached argument tuples per tool; the oldest is dropped beyond this
+_CACHE_SIZE = 256
+
+
+def _prune(entries: dict, locks: dict[Any, asyncio.Lock]) -> None:
+    """Drop expired entries, make room for one more, and free idle locks."""
+    now = time.monotonic()
+    for key in [key for key, (expires, _) in entries.items() if expires <= now]:
+        del entries[key]
+    while len(entries) >= _CACHE_SIZE:
+        # Drop the oldest entry (dicts keep insertion order)
+        entries.pop(next(iter(entries)))
+    for key in [
+        key for key, lock in locks.items() if key not in entries and not lock.locked()
+    ]:
+        del locks[key]
+
+
+def async_ttl_cache(
+    func: Callable[P, Awaitable[T]],
+) -> Callable[P, Awaitable[T]]:
+    """Cache a coroutine's result per arguments for ``tool_cache_ttl`` seconds.
+
+    Concurrent calls with the same arguments share one computation. Entries
+    are dropped early by invalidate_all(), which tools that modify the
+    index call after committing. Writes from other processes (e.g. the
+    index CLI) show up once the TTL expires. Each tool keeps at most
+    _CACHE_SIZE argument tuples; expired entries and their locks are
+    dropped whenever a new result is stored.
+    """
+    entries: dict[Any, tuple[float, T]] = {}
+    locks: dict[Any, asyncio.Lock] = {}
+    _caches.append(entries)
+
+    @functools.wraps(func)
+    async def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
+        ttl = get_settings().tool_cache_ttl
+        if ttl <= 0:
+            return await func(*args, **kwargs)
+
+        key = (args, tuple(sorted(kwargs.items())))
+        lock = locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            entry = entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                return entry[1]
+            generation = _generation
+            value = await func(*args, **kwargs)
+            if generation != _generation:
+                # Data changed mid-computation; the result may predate it
+                return value
+            _prune(entries, locks)
+            entries[key] = (time.monotonic() + ttl, value)
+            return value
+
+    return wrapper
+
+
+def invalidate_all() -> None:
+    """Drop every cached tool result, including any still being computed."""
+    global _generation
+    _generation += 1
+    for entries in _caches:
+        entries.clear()
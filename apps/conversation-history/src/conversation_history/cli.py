@@ -20,6 +20,18 @@ def index_main():
         action="store_true",
         help="Force re-indexing even if content unchanged",
     )
+    parser.add_argument(
+        "--rebuild-indexes",
+        action="store_true",
+        help="With --force (all projects): drop vector indexes before "
+        "re-indexing and rebuild them afterwards",
+    )
+    parser.add_argument(
+        "--embed-pending",
+        action="store_true",
+        help="Embed stored conversations that have no embedding yet "
+        "(e.g. after an embedding model change), without rescanning sources",
+    )
     parser.add_argument(
         "--init-db",
         action="store_true",
@@ -47,7 +59,9 @@ def index_main():
     )
     args = parser.parse_args()
 
-    if args.import_agent_progress:
+    if args.embed_pending:
+        asyncio.run(_run_embed_pending())
+    elif args.import_agent_progress:
         asyncio.run(
             _run_agent_progress_import(
                 args.workflow_id,
@@ -57,22 +71,35 @@ def index_main():
             )
         )
     else:
-        asyncio.run(_run_index(args.project, args.force, args.init_db))
+        asyncio.run(
+            _run_index(args.project, args.force, args.init_db, args.rebuild_indexes)
+        )
 
 
-async def _run_index(project: str | None, force: bool, init_db: bool):
+async def _run_index(
+    project: str | None,
+    force: bool,
+    init_db: bool,
+    rebuild_indexes: bool = False,
+):
     """Run the indexing process."""
     from sqlalchemy import text
 
-    from .config import settings
-    from .db import AsyncSessionLocal
-    from .db.engine import engine
+    from .config import get_settings
+    from .db import (
+        drop_vector_indexes,
+        ensure_vector_indexes,
+        get_engine,
+        get_session_factory,
+    )
     from .db.models import Base
     from .indexer import ConversationIndexer, ConversationScanner
 
+    settings = get_settings()
+
     if init_db:
         print("Initializing database tables...")
-        async with engine.begin() as conn:
+        async with get_engine().begin() as conn:
             # Enable pgvector extension
             await conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
             await conn.run_sync(Base.metadata.create_all)
@@ -84,21 +111,61 @@ async def _run_index(project: str | None, force: bool, init_db: bool):
 
     scanner = ConversationScanner(settings.projects_root)
 
-    async with AsyncSessionLocal() as session:
-        indexer = ConversationIndexer(session, scanner=scanner)
-
-        if project:
-            print(f"Indexing project: {project}")
-            result = await indexer.index_project(project, force=force)
+    if rebuild_indexes:
+        if force and not project:
+            # Rewriting every row would otherwise pay HNSW maintenance per update
+            print("Dropping vector indexes for bulk re-index...")
+            await drop_vector_indexes()
         else:
-            print("Indexing all projects...")
-            result = await indexer.index_all(force=force)
+            print("WARNING: --rebuild-indexes requires --force without --project; ignoring.")
+
+    try:
+        async with get_session_factory()() as session:
+            indexer = ConversationIndexer(session, scanner=scanner)
+
+            if project:
+                print(f"Indexing project: {project}")
+                result = await indexer.index_project(project, force=force)
+            else:
+                print("Indexing all projects...")
+                result = await indexer.index_all(force=force)
+
+            print(f"\nIndexing complete:")
+            print(f"  New files indexed: {result.files_indexed}")
+            print(f"  Files updated: {result.files_updated}")
+            print(f"  Files skipped: {result.files_skipped}")
+            print(f"  Files failed: {result.files_failed}")
+
+            if result.errors:
+                print(f"\nErrors:")
+                for error in result.errors[:10]:
+                    print(f"  - {error}")
+    finally:
+        # Build vector indexes after the bulk load, when HNSW construction is cheapest
+        print("\nEnsuring vector indexes...")
+        await ensure_vector_indexes()
+
+
+async def _run_embed_pending():
+    """Embed conversations still missing an embedding."""
+    from .config import get_settings
+    from .db import get_session_factory
+    from .indexer import ConversationIndexer
+
+    settings = get_settings()
+
+    if not settings.has_openai:
+        print("ERROR: OPENAI_API_KEY not configured", file=sys.stderr)
+        sys.exit(1)
+
+    async with get_session_factory()() as session:
+        indexer = ConversationIndexer(session)
+        print("Embedding pending conversations...")
+        result = await indexer.embed_pending()
 
-        print(f"\nIndexing complete:")
-        print(f"  New files indexed: {result.files_indexed}")
-        print(f"  Files updated: {result.files_updated}")
-        print(f"  Files skipped: {result.files_skipped}")
-        print(f"  Files failed: {result.files_failed}")
+        print(f"\nEmbedding complete:")
+        print(f"  Conversations embedded: {result.files_updated}")
+        print(f"  Conversations failed: {result.files_failed}")
 
         if result.errors:
             print(f"\nErrors:")
@@ -113,9 +180,11 @@ async def _run_agent_progress_import(
     dry_run: bool,
 ):
     """Run the agent-progress import process."""
-    from .config import settings
-    from .db import AsyncSessionLocal
-    from .indexer import AgentProgressSource, ConversationIndexer
+    from .config import get_settings
+    from .db import get_session_factory
+    from .indexer import AgentProgressSource, ConversationIndexer, aiter_files
+
+    settings = get_settings()
 
     if not settings.has_source_database:
         print(
@@ -131,34 +200,42 @@ async def _run_agent_progress_import(
 
     source = AgentProgressSource()
 
-    # Fetch workflows based on criteria
+    # Fetch workflows based on criteria; both paths yield files as a stream
     print("Scanning agent-progress database...")
     if workflow_id:
         print(f"  Looking for workflow: {workflow_id}")
-        files = await source.scan_workflow(workflow_id)
+        files = aiter_files(await source.scan_workflow(workflow_id))
     else:
         print(f"  Looking for workflows from last {since_days} days")
-        files = await source.scan_since(since_days)
-
-    print(f"Found {len(files)} workflows")
+        files = source.scan_since(since_days)
 
     if dry_run:
         print("\nDry run - would import:")
-        for f in files[:20]:
-            print(f"  - {f.title} ({f.project_name}) [{len(f.content)} chars]")
-        if len(files) > 20:
-            print(f"  ... and {len(files) - 20} more")
-        return
-
-    if not files:
-        print("No workflows to import.")
+        found = 0
+        async for f in files:
+            if found < 20:
+                print(f"  - {f.title} ({f.project_name}) [{len(f.content)} chars]")
+            found += 1
+        if found > 20:
+            print(f"  ... and {found - 20} more")
+        print(f"Found {found} workflows")
         return
 
-    async with AsyncSessionLocal() as session:
+    async with get_session_factory()() as session:
         indexer = ConversationIndexer(session, source=source)
-        result = await indexer.index_files(files, force=force)
+        result = await indexer.index_stream(files, force=force)
+
+        found = (
+            result.files_indexed
+            + result.files_updated
+            + result.files_skipped
+            + result.files_failed
+        )
+        if not found:
+            print("No workflows to import.")
+            return
 
-        print(f"\nImport complete:")
+        print(f"\nImport complete ({found} workflows found):")
         print(f"  Workflows indexed: {result.files_indexed}")
         print(f"  Workflows updated: {result.files_updated}")
         print(f"  Workflows skipped: {result.files_skipped}")
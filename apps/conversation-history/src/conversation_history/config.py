@@ -1,5 +1,7 @@
 """Application configuration via pydantic-settings."""
 
+from functools import cached_property, lru_cache
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -15,11 +17,16 @@ class Settings(BaseSettings):
 
     # OpenAI settings for embeddings
     openai_api_key: str | None = None
-    embedding_model: str = "text-embedding-ada-002"
-    embedding_dimensions: int = 1536
+    embedding_model: str = "text-embedding-3-small"
+    embedding_dimensions: int = 512  # Must match the HALFVEC columns
+    embedding_concurrency: int = 4  # Embedding requests in flight at once
+    embedding_max_retries: int = 5  # Backoff retries on 429 and transient errors
+    embedding_batch_window_ms: int = 5  # Wait to group concurrent search queries
+    embedding_batch_max_size: int = 64  # Search queries per grouped request
 
     # Server settings
     debug: bool = False
+    tool_cache_ttl: int = 30  # seconds to cache aggregate tool results; 0 disables
 
     # Database settings
     database_url: str | None = None
@@ -28,11 +35,23 @@ class Settings(BaseSettings):
     database_name: str = "conversation_history"
     database_user: str = "postgres"
     database_password: str = ""
+    db_pool_size: int = 20
+    db_max_overflow: int = 10
+    db_pool_recycle: int = 1800  # seconds
+    db_pool_timeout: int = 30  # seconds to wait for a free connection
+    db_statement_cache_size: int = 500
+    db_pgbouncer: bool = False  # Behind PgBouncer transaction pooling
 
     # Indexing settings
     projects_root: str = "/Users/michaelzakany/projects"
     chunk_size: int = 3000
     chunk_overlap: int = 500
+    index_concurrency: int = 4  # Embedding groups in flight at once
+
+    # Vector index settings
+    hnsw_ef_search: int = 40
+    hnsw_iterative_scan: str = "strict_order"  # off, strict_order, relaxed_order
+    index_maintenance_work_mem: str = "2GB"
 
     # Agent Progress source database (for importing)
     source_database_url: str | None = None
@@ -41,8 +60,10 @@ class Settings(BaseSettings):
     source_database_name: str = "agent_progress"
     source_database_user: str = "agent_progress"
     source_database_password: str = ""
+    source_db_pool_size: int = 2  # One streaming import plus headroom
+    source_db_max_overflow: int = 3
 
-    @property
+    @cached_property
     def async_database_url(self) -> str:
         """Get async database URL for SQLAlchemy."""
         if self.database_url:
@@ -57,7 +78,7 @@ class Settings(BaseSettings):
             f"@{self.database_host}:{self.database_port}/{self.database_name}"
         )
 
-    @property
+    @cached_property
     def sync_database_url(self) -> str:
         """Get sync database URL for Alembic."""
         if self.database_url:
@@ -80,7 +101,7 @@ class Settings(BaseSettings):
         """Check if OpenAI is configured."""
         return self.openai_api_key is not None
 
-    @property
+    @cached_property
     def async_source_database_url(self) -> str:
         """Get async database URL for source database (agent-progress)."""
         if self.source_database_url:
@@ -101,4 +122,10 @@ class Settings(BaseSettings):
         return bool(self.source_database_url or self.source_database_password)
 
 
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Get the process-wide settings instance.
+
+    Call ``get_settings.cache_clear()`` to reload from the environment.
+    """
+    return Settings()
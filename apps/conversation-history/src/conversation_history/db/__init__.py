@@ -1,6 +1,14 @@
 """Database module for conversation-history."""
 
-from .engine import AsyncSessionLocal, engine, get_db
+from .engine import (
+    dispose_engine,
+    drop_vector_indexes,
+    ensure_vector_indexes,
+    get_db,
+    get_engine,
+    get_session_factory,
+    retry_on_disconnect,
+)
 from .models import Base, Conversation, ConversationChunk, IndexStatus
 from .source_engine import (
     dispose_source_engine,
@@ -9,9 +17,13 @@ from .source_engine import (
 )
 
 __all__ = [
-    "engine",
-    "AsyncSessionLocal",
+    "get_engine",
+    "get_session_factory",
+    "retry_on_disconnect",
+    "dispose_engine",
     "get_db",
+    "ensure_vector_indexes",
+    "drop_vector_indexes",
     "Base",
     "Conversation",
     "ConversationChunk",
@@ -1,35 +1,223 @@
 """Database engine and session management."""
 
-from collections.abc import AsyncGenerator
+import functools
+import logging
+import uuid
+from collections.abc import AsyncGenerator, Awaitable, Callable, Iterable, Sequence
+from typing import Any, ParamSpec, TypeVar
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from pgvector import HalfVector
+from sqlalchemy import event, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.pool import NullPool
 
-from ..config import settings
+from ..config import get_settings
+from .models import Conversation, ConversationChunk
 
-# Create async engine with connection pooling
-engine = create_async_engine(
-    settings.async_database_url,
-    echo=settings.debug,
-    pool_size=5,
-    max_overflow=10,
-    pool_pre_ping=True,
-)
+logger = logging.getLogger(__name__)
 
-# Session factory
-AsyncSessionLocal = async_sessionmaker(
-    engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-    autoflush=False,
-)
+P = ParamSpec("P")
+T = TypeVar("T")
+
+# Module-level engine, lazily initialized
+_engine: AsyncEngine | None = None
+_session_factory: async_sessionmaker[AsyncSession] | None = None
+
+
+def _encode_halfvec(value: Any) -> bytes:
+    """Encode a halfvec in binary format.
+
+    Accepts the text form produced by the SQLAlchemy HALFVEC type as well
+    as lists/HalfVector, so ORM and COPY paths share one codec.
+    """
+    if isinstance(value, str):
+        value = HalfVector.from_text(value)
+    elif not isinstance(value, HalfVector):
+        value = HalfVector(value)
+    return value.to_binary()
+
+
+async def _set_halfvec_codec(conn) -> None:
+    try:
+        await conn.set_type_codec(
+            "halfvec",
+            encoder=_encode_halfvec,
+            decoder=HalfVector.from_binary,
+            format="binary",
+        )
+    except ValueError as e:
+        # pgvector extension not installed yet (e.g. before --init-db)
+        if not str(e).startswith("unknown type:"):
+            raise
+
+
+def _register_vector_codecs(dbapi_connection, connection_record) -> None:
+    """Use binary I/O for halfvec columns (half the bytes of the text form)."""
+    dbapi_connection.run_async(_set_halfvec_codec)
+
+
+def _unique_statement_name() -> str:
+    """Name prepared statements uniquely, as PgBouncer requires."""
+    return f"__asyncpg_{uuid.uuid4()}__"
+
+
+def get_engine() -> AsyncEngine:
+    """Get or create the database engine.
+
+    Creation is deferred until first use so that CLI paths which never
+    touch the database (--help, --dry-run) skip driver initialization.
+    """
+    global _engine
+    if _engine is None:
+        settings = get_settings()
+        if settings.db_pgbouncer:
+            # PgBouncer (transaction pooling) owns the pool; server-side
+            # prepared statements would collide across its backends
+            pool_args: dict[str, Any] = {"poolclass": NullPool}
+            connect_args: dict[str, Any] = {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": _unique_statement_name,
+                # PgBouncer rejects unknown startup parameters such as jit
+                "server_settings": {"application_name": "conversation-history"},
+            }
+        else:
+            pool_args = {
+                "pool_size": settings.db_pool_size,
+                "max_overflow": settings.db_max_overflow,
+                "pool_timeout": settings.db_pool_timeout,
+                # No SELECT 1 per checkout; stale connections are recycled by
+                # age and dropped ones are retried via retry_on_disconnect()
+                "pool_pre_ping": False,
+                "pool_recycle": settings.db_pool_recycle,
+            }
+            connect_args = {
+                # Cache prepared statements per connection to skip re-parsing
+                "prepared_statement_cache_size": settings.db_statement_cache_size,
+                # JIT compilation only adds latency for these short OLTP queries
+                "server_settings": {
+                    "jit": "off",
+                    "application_name": "conversation-history",
+                },
+            }
+        _engine = create_async_engine(
+            settings.async_database_url,
+            echo=settings.debug,
+            connect_args=connect_args,
+            **pool_args,
+        )
+        event.listen(_engine.sync_engine, "connect", _register_vector_codecs)
+    return _engine
+
+
+def get_session_factory() -> async_sessionmaker[AsyncSession]:
+    """Get or create the session factory."""
+    global _session_factory
+    if _session_factory is None:
+        _session_factory = async_sessionmaker(
+            get_engine(),
+            class_=AsyncSession,
+            expire_on_commit=False,
+            autoflush=False,
+        )
+    return _session_factory
+
+
+async def dispose_engine() -> None:
+    """Close all pooled connections and drop the engine."""
+    global _engine, _session_factory
+    if _engine:
+        await _engine.dispose()
+        _engine = None
+        _session_factory = None
+
+
+def retry_on_disconnect(
+    func: Callable[P, Awaitable[T]],
+) -> Callable[P, Awaitable[T]]:
+    """Retry a coroutine once if its database connection was dropped.
+
+    Without pool_pre_ping a dead pooled connection only surfaces on first
+    use. SQLAlchemy invalidates it, so a second attempt (which must open a
+    new session) checks out a fresh one. Only wrap idempotent calls.
+    """
+
+    @functools.wraps(func)
+    async def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
+        try:
+            return await func(*args, **kwargs)
+        except DBAPIError as e:
+            if not e.connection_invalidated:
+                raise
+            logger.warning(f"Database connection lost in {func.__name__}, retrying")
+            return await func(*args, **kwargs)
+
+    return wrapper
 
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """Dependency for database sessions."""
-    async with AsyncSessionLocal() as session:
+    async with get_session_factory()() as session:
         try:
             yield session
             await session.commit()
         except Exception:
             await session.rollback()
             raise
+
+
+async def copy_records(
+    session: AsyncSession,
+    table: str,
+    columns: Sequence[str],
+    records: Iterable[tuple],
+) -> None:
+    """Bulk-load rows with binary COPY on the session's connection.
+
+    Runs inside the session's current transaction and bypasses the ORM
+    unit of work entirely.
+    """
+    conn = await session.connection()
+    raw = await conn.get_raw_connection()
+    await raw.driver_connection.copy_records_to_table(
+        table, records=records, columns=columns
+    )
+
+
+def _hnsw_indexes():
+    """Yield the HNSW vector indexes declared on the models."""
+    for table in (Conversation.__table__, ConversationChunk.__table__):
+        for index in table.indexes:
+            if index.dialect_options["postgresql"]["using"] == "hnsw":
+                yield index
+
+
+async def ensure_vector_indexes() -> None:
+    """Create any missing HNSW vector indexes.
+
+    HNSW graphs build much faster over populated tables, so this is meant
+    to run after a bulk load rather than before it.
+    """
+    async with get_engine().begin() as conn:
+        await conn.execute(
+            text("SELECT set_config('maintenance_work_mem', :mem, true)"),
+            {"mem": get_settings().index_maintenance_work_mem},
+        )
+        for index in _hnsw_indexes():
+            await conn.run_sync(index.create, checkfirst=True)
+
+
+async def drop_vector_indexes() -> None:
+    """Drop the HNSW vector indexes ahead of a bulk re-index.
+
+    Rebuild them with ensure_vector_indexes() once loading finishes.
+    """
+    async with get_engine().begin() as conn:
+        for index in _hnsw_indexes():
+            await conn.run_sync(index.drop, checkfirst=True)
@@ -1,14 +1,38 @@
 """SQLAlchemy ORM models with pgvector support."""
 
+import os
+import time
 import uuid
 from datetime import datetime
 
-from pgvector.sqlalchemy import Vector
-from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, Text, func
-from sqlalchemy.dialects.postgresql import UUID
+from pgvector.sqlalchemy import HALFVEC
+from sqlalchemy import (
+    Computed,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    func,
+    text,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 
+def uuid7() -> uuid.UUID:
+    """Generate a time-ordered UUIDv7 (RFC 9562).
+
+    A 48-bit millisecond timestamp leads, so new keys land at the right
+    edge of the primary-key b-tree instead of on random pages.
+    """
+    value = (time.time_ns() // 1_000_000) << 80 | int.from_bytes(os.urandom(10))
+    value = value & ~(0xF << 76) | 0x7 << 76  # version 7
+    value = value & ~(0x3 << 62) | 0x2 << 62  # RFC 4122 variant
+    return uuid.UUID(int=value)
+
+
 class Base(DeclarativeBase):
     """Base class for all models."""
 
@@ -21,7 +45,7 @@ class Conversation(Base):
     __tablename__ = "conversations"
 
     id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+        UUID(as_uuid=True), primary_key=True, default=uuid7
     )
     file_path: Mapped[str] = mapped_column(Text, unique=True, nullable=False)
     project_name: Mapped[str] = mapped_column(String(200), nullable=False)
@@ -33,11 +57,25 @@ class Conversation(Base):
     content: Mapped[str] = mapped_column(Text, nullable=False)
     content_hash: Mapped[str] = mapped_column(
         String(64), nullable=False
-    )  # SHA256 for change detection
+    )  # xxh3-128 hex for change detection (legacy rows: SHA256)
+    embedding_hash: Mapped[str | None] = mapped_column(
+        String(32), index=True
+    )  # xxh3-128 of the embedded content prefix, for embedding reuse
     source_id: Mapped[str | None] = mapped_column(
-        String(200), nullable=True, index=True
+        String(200), nullable=True
     )  # External source ID, e.g. "agent-progress:workflow:{uuid}"
-    embedding: Mapped[list[float] | None] = mapped_column(Vector(1536))
+    content_tsv: Mapped[str | None] = mapped_column(
+        TSVECTOR,
+        Computed(
+            "to_tsvector('english'::regconfig, "
+            "coalesce(title, '') || ' ' || left(content, 500000))",
+            persisted=True,
+        ),
+        deferred=True,
+    )  # For keyword search; input capped under the 1 MB tsvector limit
+    embedding: Mapped[list[float] | None] = mapped_column(
+        HALFVEC(512)
+    )  # Half-precision, 512-dim (text-embedding-3-small truncated): 1 KB/row
     indexed_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
     )
@@ -46,15 +84,46 @@ class Conversation(Base):
     )
 
     # Relationships
+    # ON DELETE CASCADE removes chunks in the database; passive_deletes
+    # keeps the ORM from loading them just to delete them one by one
     chunks: Mapped[list["ConversationChunk"]] = relationship(
-        back_populates="conversation", cascade="all, delete-orphan"
+        back_populates="conversation",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
 
     __table_args__ = (
-        Index("ix_conversations_project_name", "project_name"),
-        Index("ix_conversations_doc_type", "doc_type"),
-        Index("ix_conversations_feature_name", "feature_name"),
-        Index("ix_conversations_content_hash", "content_hash"),
+        Index("ix_conversations_project_feature", "project_name", "feature_name"),
+        # Browse listings filter by type or project and page newest first
+        # on (indexed_at, id)
+        Index(
+            "ix_conversations_doc_type_indexed",
+            "doc_type",
+            text("indexed_at DESC"),
+            text("id DESC"),
+        ),
+        Index(
+            "ix_conversations_project_indexed",
+            "project_name",
+            text("indexed_at DESC"),
+            text("id DESC"),
+        ),
+        Index(
+            "ix_conversations_content_tsv", "content_tsv", postgresql_using="gin"
+        ),
+        # Only holds rows still awaiting an embedding (the re-embed backlog)
+        Index(
+            "ix_conversations_pending_embed",
+            "id",
+            postgresql_where=text("embedding IS NULL"),
+        ),
+        Index(
+            "ix_conversations_embedding_hnsw",
+            "embedding",
+            postgresql_using="hnsw",
+            postgresql_with={"m": 16, "ef_construction": 64},
+            postgresql_ops={"embedding": "halfvec_cosine_ops"},
+        ),
     )
 
 
@@ -64,7 +133,7 @@ class ConversationChunk(Base):
     __tablename__ = "conversation_chunks"
 
     id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+        UUID(as_uuid=True), primary_key=True, default=uuid7
     )
     conversation_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
@@ -73,12 +142,25 @@ class ConversationChunk(Base):
     )
     chunk_index: Mapped[int] = mapped_column(Integer, nullable=False)
     content: Mapped[str] = mapped_column(Text, nullable=False)
-    embedding: Mapped[list[float] | None] = mapped_column(Vector(1536))
+    content_hash: Mapped[str | None] = mapped_column(
+        String(32)
+    )  # xxh3-128 hex, for reusing embeddings of unchanged chunks
+    embedding: Mapped[list[float] | None] = mapped_column(HALFVEC(512))
 
     # Relationships
     conversation: Mapped[Conversation] = relationship(back_populates="chunks")
 
-    __table_args__ = (Index("ix_chunks_conversation_id", "conversation_id"),)
+    __table_args__ = (
+        Index("ix_chunks_conversation_id", "conversation_id"),
+        Index("ix_chunks_content_hash", "content_hash"),
+        Index(
+            "ix_chunks_embedding_hnsw",
+            "embedding",
+            postgresql_using="hnsw",
+            postgresql_with={"m": 16, "ef_construction": 64},
+            postgresql_ops={"embedding": "halfvec_cosine_ops"},
+        ),
+    )
 
 
 class IndexStatus(Base):
@@ -2,7 +2,7 @@
 
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
-from ..config import settings
+from ..config import get_settings
 
 # Module-level engine, lazily initialized
 _source_engine = None
@@ -20,6 +20,7 @@ def get_source_engine():
     """
     global _source_engine
     if _source_engine is None:
+        settings = get_settings()
         if not settings.has_source_database:
             raise ValueError(
                 "Source database not configured. "
@@ -27,9 +28,19 @@ def get_source_engine():
             )
         _source_engine = create_async_engine(
             settings.async_source_database_url,
-            pool_size=2,  # Small pool for read-only imports
-            max_overflow=3,
-            pool_pre_ping=True,
+            # Read-only imports; AsyncAdaptedQueuePool sized by settings
+            pool_size=settings.source_db_pool_size,
+            max_overflow=settings.source_db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+            pool_pre_ping=False,
+            pool_recycle=settings.db_pool_recycle,
+            connect_args={
+                "prepared_statement_cache_size": settings.db_statement_cache_size,
+                "server_settings": {
+                    "jit": "off",
+                    "application_name": "conversation-history-import",
+                },
+            },
         )
     return _source_engine
 
@@ -2,7 +2,7 @@
 
 from .agent_progress_source import AgentProgressSource
 from .embedder import Embedder
-from .indexer import ConversationIndexer
+from .indexer import ConversationIndexer, aiter_files
 from .scanner import ConversationScanner
 from .source import ConversationSource
 
@@ -12,4 +12,5 @@ __all__ = [
     "ConversationSource",
     "Embedder",
     "ConversationIndexer",
+    "aiter_files",
 ]
@@ -1,20 +1,73 @@
 """Source for importing agent progress data from agent-progress database."""
 
-import hashlib
+import io
 import logging
+from collections import defaultdict
+from collections.abc import AsyncIterator, Sequence
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from itertools import islice
 from typing import Any
 
-from sqlalchemy import text
+from sqlalchemy import TextClause, text
 
 from ..db.source_engine import get_source_session_factory
-from .scanner import ConversationFile
+from .scanner import ConversationFile, hash_content
 
 logger = logging.getLogger(__name__)
 
 # Maximum content size before truncation (100KB)
 MAX_CONTENT_SIZE = 100_000
 
+# Workflows whose agents and events are fetched together
+WORKFLOW_FETCH_BATCH_SIZE = 100
+
+# Limit on timeline events rendered per agent
+MAX_EVENTS_PER_AGENT = 50
+
+EVENT_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Payload fields tried, in order, when summarizing an event
+PAYLOAD_SUMMARY_KEYS = ("message", "summary", "status", "result", "error")
+
+_MISSING = object()
+
+
+@lru_cache(maxsize=None)
+def _workflow_query(
+    by_workflow_id: bool, by_project_name: bool, by_since_date: bool
+) -> TextClause:
+    """Build the workflow query for a combination of filters.
+
+    There are only eight combinations, each with fixed SQL text, so the
+    clause is built once per combination and asyncpg's prepared-statement
+    cache is hit on every later scan. Filters are added only when set,
+    rather than as always-present "IS NULL OR" guards, which would leave
+    the planner a generic plan that cannot use the primary key.
+    """
+    query = """
+        SELECT
+            w.id,
+            w.name,
+            w.project_name,
+            w.status,
+            w.started_at,
+            w.completed_at,
+            w.metadata,
+            w.created_at
+        FROM workflows w
+        WHERE 1=1
+    """
+    if by_workflow_id:
+        query += " AND w.id = :workflow_id"
+    if by_project_name:
+        query += " AND w.project_name = :project_name"
+    if by_since_date:
+        query += " AND w.started_at >= :since_date"
+    query += " ORDER BY w.started_at DESC"
+
+    return text(query).execution_options(yield_per=WORKFLOW_FETCH_BATCH_SIZE)
+
 
 class AgentProgressSource:
     """Source for importing agent progress data.
@@ -36,17 +89,20 @@ class AgentProgressSource:
         """Fetch workflows for a specific project."""
         return await self._fetch_workflows(project_name=project_name)
 
-    async def scan_since(self, since_days: int = 30) -> list[ConversationFile]:
-        """Fetch workflows from the last N days.
+    def scan_since(self, since_days: int = 30) -> AsyncIterator[ConversationFile]:
+        """Stream workflows from the last N days.
+
+        Rows are read through a server-side cursor, so memory stays bounded
+        and callers can start indexing before the scan completes.
 
         Args:
             since_days: Number of days to look back (default: 30)
 
         Returns:
-            List of ConversationFile objects for recent workflows.
+            Async iterator of ConversationFile objects for recent workflows.
         """
         since_date = datetime.now(timezone.utc) - timedelta(days=since_days)
-        return await self._fetch_workflows(since_date=since_date)
+        return self._iter_workflows(since_date=since_date)
 
     async def scan_workflow(self, workflow_id: str) -> list[ConversationFile]:
         """Fetch a specific workflow by ID.
@@ -65,7 +121,7 @@ class AgentProgressSource:
         since_date: datetime | None = None,
         workflow_id: str | None = None,
     ) -> list[ConversationFile]:
-        """Fetch workflows from agent-progress database.
+        """Fetch workflows from agent-progress database into a list.
 
         Args:
             project_name: Filter by project name (optional).
@@ -75,85 +131,108 @@ class AgentProgressSource:
         Returns:
             List of ConversationFile objects.
         """
+        return [
+            conv_file
+            async for conv_file in self._iter_workflows(
+                project_name=project_name,
+                since_date=since_date,
+                workflow_id=workflow_id,
+            )
+        ]
+
+    async def _iter_workflows(
+        self,
+        project_name: str | None = None,
+        since_date: datetime | None = None,
+        workflow_id: str | None = None,
+    ) -> AsyncIterator[ConversationFile]:
+        """Stream workflows from agent-progress database.
+
+        Args:
+            project_name: Filter by project name (optional).
+            since_date: Only fetch workflows started after this date.
+            workflow_id: Fetch a specific workflow by ID.
+
+        Yields:
+            ConversationFile objects, one per workflow.
+        """
         try:
             session_factory = get_source_session_factory()
         except ValueError as e:
             logger.error(f"Source database not configured: {e}")
-            return []
-
-        results = []
+            return
 
         async with session_factory() as session:
             try:
-                # Build workflow query
-                workflow_query = """
-                    SELECT
-                        w.id,
-                        w.name,
-                        w.project_name,
-                        w.status,
-                        w.started_at,
-                        w.completed_at,
-                        w.metadata,
-                        w.created_at
-                    FROM workflows w
-                    WHERE 1=1
-                """
                 params: dict[str, Any] = {}
-
                 if workflow_id:
-                    workflow_query += " AND w.id = :workflow_id"
                     params["workflow_id"] = workflow_id
                 if project_name:
-                    workflow_query += " AND w.project_name = :project_name"
                     params["project_name"] = project_name
                 if since_date:
-                    workflow_query += " AND w.started_at >= :since_date"
                     params["since_date"] = since_date
 
-                workflow_query += " ORDER BY w.started_at DESC"
-
-                workflow_result = await session.execute(
-                    text(workflow_query), params
+                # Server-side cursor: rows arrive as they are consumed, one
+                # fetch per page so memory stays at a single page
+                workflow_result = await session.stream(
+                    _workflow_query(
+                        bool(workflow_id), bool(project_name), bool(since_date)
+                    ),
+                    params,
                 )
-                workflows = workflow_result.fetchall()
-
-                for workflow in workflows:
-                    try:
-                        # Fetch agents for this workflow
-                        agents = await self._fetch_agents(session, str(workflow.id))
-
-                        # Fetch events for each agent
-                        agent_events = {}
-                        for agent in agents:
-                            events = await self._fetch_events(
-                                session, str(agent.id)
+
+                async for workflows in workflow_result.partitions():
+                    # Two queries per page of workflows instead of one per
+                    # workflow plus one per agent
+                    agents_by_workflow = await self._fetch_agents(
+                        session, [str(w.id) for w in workflows]
+                    )
+                    agent_events = await self._fetch_events(
+                        session,
+                        [
+                            str(agent.id)
+                            for agents in agents_by_workflow.values()
+                            for agent in agents
+                        ],
+                    )
+
+                    for workflow in workflows:
+                        try:
+                            # Convert to ConversationFile
+                            conv_file = self._workflow_to_conversation(
+                                workflow,
+                                agents_by_workflow.get(str(workflow.id), []),
+                                agent_events,
                             )
-                            agent_events[str(agent.id)] = events
 
-                        # Convert to ConversationFile
-                        conv_file = self._workflow_to_conversation(
-                            workflow, agents, agent_events
-                        )
-                        if conv_file:
-                            results.append(conv_file)
+                        except Exception as e:
+                            logger.error(
+                                f"Error processing workflow {workflow.id}: {e}"
+                            )
+                            continue
 
-                    except Exception as e:
-                        logger.error(
-                            f"Error processing workflow {workflow.id}: {e}"
-                        )
-                        continue
+                        if conv_file:
+                            yield conv_file
 
             except Exception as e:
                 logger.error(f"Error fetching workflows: {e}")
 
-        return results
+    async def _fetch_agents(
+        self, session, workflow_ids: Sequence[str]
+    ) -> dict[str, list]:
+        """Fetch all agents for a set of workflows.
+
+        Returns:
+            Dict mapping workflow_id to its agents, oldest first.
+        """
+        agents_by_workflow: dict[str, list] = defaultdict(list)
+        if not workflow_ids:
+            return agents_by_workflow
 
-    async def _fetch_agents(self, session, workflow_id: str) -> list:
-        """Fetch all agents for a workflow."""
         query = """
             SELECT
                 a.id,
+                a.workflow_id,
                 a.name,
                 a.agent_type,
                 a.status,
@@ -163,26 +242,43 @@ class AgentProgressSource:
                 a.parent_id,
                 a.metadata
             FROM agents a
-            WHERE a.workflow_id = :workflow_id
-            ORDER BY a.started_at ASC
+            WHERE a.workflow_id = ANY(:workflow_ids)
+            ORDER BY a.workflow_id, a.started_at ASC
+        """
+        result = await session.execute(
+            text(query), {"workflow_ids": list(workflow_ids)}
+        )
+        for agent in result:
+            agents_by_workflow[str(agent.workflow_id)].append(agent)
+        return agents_by_workflow
+
+    async def _fetch_events(
+        self, session, agent_ids: Sequence[str]
+    ) -> dict[str, list]:
+        """Fetch all events for a set of agents.
+
+        Returns:
+            Dict mapping agent_id to its events, oldest first.
         """
-        result = await session.execute(text(query), {"workflow_id": workflow_id})
-        return result.fetchall()
+        events_by_agent: dict[str, list] = defaultdict(list)
+        if not agent_ids:
+            return events_by_agent
 
-    async def _fetch_events(self, session, agent_id: str) -> list:
-        """Fetch all events for an agent."""
         query = """
             SELECT
                 e.id,
+                e.agent_id,
                 e.event_type,
                 e.payload,
                 e.created_at
             FROM agent_events e
-            WHERE e.agent_id = :agent_id
-            ORDER BY e.created_at ASC
+            WHERE e.agent_id = ANY(:agent_ids)
+            ORDER BY e.agent_id, e.created_at ASC
         """
-        result = await session.execute(text(query), {"agent_id": agent_id})
-        return result.fetchall()
+        result = await session.execute(text(query), {"agent_ids": list(agent_ids)})
+        for event in result:
+            events_by_agent[str(event.agent_id)].append(event)
+        return events_by_agent
 
     def _workflow_to_conversation(
         self,
@@ -201,17 +297,15 @@ class AgentProgressSource:
             ConversationFile or None if content is empty.
         """
         # Build markdown document optimized for embedding search
-        lines = []
+        buf = io.StringIO()
 
         # Header
         workflow_name = workflow.name or "Unnamed Workflow"
-        lines.append(f"# {workflow_name} - Agent Workflow Execution")
-        lines.append("")
+        buf.write(f"# {workflow_name} - Agent Workflow Execution\n\n")
 
         # Metadata
         project = workflow.project_name or "unknown"
-        lines.append(f"Project: {project}")
-        lines.append(f"Status: {workflow.status or 'unknown'}")
+        buf.write(f"Project: {project}\nStatus: {workflow.status or 'unknown'}\n")
 
         if workflow.started_at:
             started = workflow.started_at.isoformat()
@@ -220,40 +314,40 @@ class AgentProgressSource:
                 if workflow.completed_at
                 else "in progress"
             )
-            lines.append(f"Duration: {started} to {completed}")
+            buf.write(f"Duration: {started} to {completed}\n")
 
         # Agent names summary
         agent_names = [a.name or a.agent_type for a in agents]
         if agent_names:
-            lines.append(f"Agents: {', '.join(agent_names)}")
+            buf.write(f"Agents: {', '.join(agent_names)}\n")
 
-        lines.append("")
+        buf.write("\n")
 
         # Summary section
-        lines.append("## Summary")
+        buf.write("## Summary\n")
         task_summaries = self._extract_task_summaries(agents, agent_events)
         if task_summaries:
-            lines.append(
+            buf.write(
                 f"This workflow executed {len(agents)} agents. "
-                f"The main tasks included: {task_summaries}"
+                f"The main tasks included: {task_summaries}\n\n"
             )
         else:
-            lines.append(f"This workflow executed {len(agents)} agents.")
-        lines.append("")
+            buf.write(f"This workflow executed {len(agents)} agents.\n\n")
 
         # Agent hierarchy
         if agents:
-            lines.append("## Agent Hierarchy")
-            lines.append("")
+            summarize_payload = self._summarize_payload
+            buf.write("## Agent Hierarchy\n\n")
 
             for agent in agents:
                 agent_name = agent.name or "unnamed"
                 agent_type = agent.agent_type or "unknown"
-                lines.append(f"### {agent_name} ({agent_type})")
-
                 status = agent.status or "unknown"
                 progress = agent.progress or 0
-                lines.append(f"Status: {status} | Progress: {progress}%")
+                buf.write(
+                    f"### {agent_name} ({agent_type})\n"
+                    f"Status: {status} | Progress: {progress}%\n"
+                )
 
                 if agent.started_at:
                     started = agent.started_at.isoformat()
@@ -262,40 +356,51 @@ class AgentProgressSource:
                         if agent.completed_at
                         else "in progress"
                     )
-                    lines.append(f"Started: {started} | Completed: {completed}")
+                    buf.write(f"Started: {started} | Completed: {completed}\n")
 
-                lines.append("")
+                buf.write("\n")
 
                 # Events for this agent
                 events = agent_events.get(str(agent.id), [])
                 if events:
-                    lines.append("#### Event Timeline")
-                    for event in events[:50]:  # Limit events per agent
-                        timestamp = (
-                            event.created_at.strftime("%Y-%m-%d %H:%M:%S")
-                            if event.created_at
-                            else "unknown"
+                    buf.write("#### Event Timeline\n")
+                    # One write per agent; islice limits events without
+                    # copying the list
+                    buf.write(
+                        "".join(
+                            f"- {format(event.created_at, EVENT_TIME_FORMAT) if event.created_at else 'unknown'}: "
+                            f"{event.event_type or 'event'} - "
+                            f"{summarize_payload(event.payload)}\n"
+                            for event in islice(events, MAX_EVENTS_PER_AGENT)
                         )
-                        event_type = event.event_type or "event"
-                        payload_summary = self._summarize_payload(event.payload)
-                        lines.append(f"- {timestamp}: {event_type} - {payload_summary}")
-                    lines.append("")
-
-        content = "\n".join(lines)
+                    )
+                    buf.write("\n")
+
+        # Trim in the buffer so the content string is materialized once.
+        # The final newline is dropped to match the previous line-joined output
+        length = buf.tell() - 1
+        if length > MAX_CONTENT_SIZE:
+            # Truncate if too large
+            buf.truncate(MAX_CONTENT_SIZE)
+            buf.seek(MAX_CONTENT_SIZE)
+            buf.write("\n\n[Content truncated due to size]")
+        else:
+            buf.truncate(length)
+        content = buf.getvalue()
 
-        # Truncate if too large
-        if len(content) > MAX_CONTENT_SIZE:
-            content = content[:MAX_CONTENT_SIZE]
-            content += "\n\n[Content truncated due to size]"
+        # Encode once: the bytes are both scanned for NULs and hashed
+        raw = content.encode()
 
-        # Remove null bytes
-        content = content.replace("\x00", "")
+        # Remove null bytes (a memchr scan; decode again only if any found)
+        if b"\x00" in raw:
+            raw = raw.replace(b"\x00", b"")
+            content = raw.decode()
 
         if not content.strip():
             return None
 
         # Calculate content hash
-        content_hash = hashlib.sha256(content.encode()).hexdigest()
+        content_hash = hash_content(raw)
 
         # Generate source_id for deduplication
         source_id = f"agent-progress:workflow:{workflow.id}"
@@ -340,15 +445,14 @@ class AgentProgressSource:
             return "(no details)"
 
         if isinstance(payload, dict):
-            # Try common fields
-            for key in ("message", "summary", "status", "result", "error"):
-                if key in payload:
-                    value = str(payload[key])[:100]
-                    return value
-
-            # Fall back to key names
-            keys = list(payload.keys())[:3]
-            return f"({', '.join(keys)})"
+            # Try common fields, one lookup each
+            for key in PAYLOAD_SUMMARY_KEYS:
+                value = payload.get(key, _MISSING)
+                if value is not _MISSING:
+                    return str(value)[:100]
+
+            # Fall back to key names, without listing every key
+            return f"({', '.join(islice(payload, 3))})"
 
         if isinstance(payload, str):
             return payload[:100]
@@ -1,11 +1,12 @@
 """OpenAI embedding generation."""
 
 import asyncio
+import time
 from typing import TYPE_CHECKING
 
 from openai import AsyncOpenAI
 
-from ..config import settings
+from ..config import get_settings
 
 if TYPE_CHECKING:
     pass
@@ -14,10 +15,20 @@ if TYPE_CHECKING:
 class Embedder:
     """Generates embeddings using OpenAI API."""
 
-    def __init__(self, api_key: str | None = None, model: str | None = None):
+    def __init__(
+        self,
+        api_key: str | None = None,
+        model: str | None = None,
+        dimensions: int | None = None,
+    ):
+        settings = get_settings()
         self.api_key = api_key or settings.openai_api_key
         self.model = model or settings.embedding_model
+        self.dimensions = dimensions or settings.embedding_dimensions
         self._client: AsyncOpenAI | None = None
+        # Shared by every caller of this embedder, so concurrent indexing
+        # groups together stay within the request limit
+        self._request_slots = asyncio.Semaphore(settings.embedding_concurrency)
 
     @property
     def client(self) -> AsyncOpenAI:
@@ -25,7 +36,11 @@ class Embedder:
         if self._client is None:
             if not self.api_key:
                 raise ValueError("OpenAI API key not configured")
-            self._client = AsyncOpenAI(api_key=self.api_key)
+            # The client backs off on 429s itself, honouring Retry-After
+            self._client = AsyncOpenAI(
+                api_key=self.api_key,
+                max_retries=get_settings().embedding_max_retries,
+            )
         return self._client
 
     async def embed_text(self, text: str) -> list[float]:
@@ -33,26 +48,107 @@ class Embedder:
         response = await self.client.embeddings.create(
             model=self.model,
             input=text,
+            dimensions=self.dimensions,
         )
         return response.data[0].embedding
 
     async def embed_batch(
         self, texts: list[str], batch_size: int = 100
     ) -> list[list[float]]:
-        """Generate embeddings for multiple texts in batches."""
-        all_embeddings = []
-
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i : i + batch_size]
-            response = await self.client.embeddings.create(
-                model=self.model,
-                input=batch,
+        """Generate embeddings for multiple texts in batches.
+
+        Batches are sent concurrently, bounded by embedding_concurrency;
+        results keep the order of the input texts.
+        """
+
+        async def embed_one(batch: list[str]) -> list[list[float]]:
+            async with self._request_slots:
+                response = await self.client.embeddings.create(
+                    model=self.model,
+                    input=batch,
+                    dimensions=self.dimensions,
+                )
+            return [item.embedding for item in response.data]
+
+        results = await asyncio.gather(
+            *(
+                embed_one(texts[i : i + batch_size])
+                for i in range(0, len(texts), batch_size)
             )
-            batch_embeddings = [item.embedding for item in response.data]
-            all_embeddings.extend(batch_embeddings)
+        )
+        return [embedding for batch in results for embedding in batch]
+
 
-            # Rate limiting - small delay between batches
-            if i + batch_size < len(texts):
-                await asyncio.sleep(0.1)
+class EmbeddingBatcher:
+    """Groups concurrent single-text embeddings into one request.
+
+    Texts submitted within ``max_wait_ms`` of each other (up to
+    ``max_size``) share one embeddings call, so a burst of searches pays
+    one API round trip instead of one each. Duplicate texts in a batch
+    are embedded once. Batches are sent without waiting for the previous
+    one to return, bounded by the embedder's request limit.
+    """
+
+    def __init__(
+        self,
+        embedder: Embedder,
+        max_size: int | None = None,
+        max_wait_ms: int | None = None,
+    ):
+        settings = get_settings()
+        self.embedder = embedder
+        self.max_size = max_size or settings.embedding_batch_max_size
+        self.max_wait = (
+            max_wait_ms if max_wait_ms is not None else settings.embedding_batch_window_ms
+        ) / 1000
+        self._queue: asyncio.Queue[tuple[str, asyncio.Future]] | None = None
+        self._worker: asyncio.Task | None = None
+        # Flushes in flight; holding them keeps the tasks from being collected
+        self._flushes: set[asyncio.Task] = set()
+
+    async def submit(self, text: str) -> list[float]:
+        """Embed one text as part of the next batch."""
+        if self._worker is None or self._worker.done():
+            # Bound to the running loop, so created on first use
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, future))
+        return await future
+
+    async def _run(self) -> None:
+        """Drain the queue into batches until cancelled."""
+        while True:
+            batch = [await self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            # Collect the next batch while this one is being embedded
+            flush = asyncio.create_task(self._flush(batch))
+            self._flushes.add(flush)
+            flush.add_done_callback(self._flushes.discard)
+
+    async def _flush(self, batch: list[tuple[str, asyncio.Future]]) -> None:
+        """Embed a batch and resolve each caller's future."""
+        texts = list(dict.fromkeys(text for text, _ in batch))
+        try:
+            embeddings = await self.embedder.embed_batch(
+                texts, batch_size=self.max_size
+            )
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
 
-        return all_embeddings
+        by_text = dict(zip(texts, embeddings))
+        for text, future in batch:
+            # Skip callers that were cancelled while waiting
+            if not future.done():
+                future.set_result(by_text[text])
@@ -1,22 +1,136 @@
 """Main indexer orchestrator."""
 
 import asyncio
+import contextlib
 import logging
+import uuid
+from collections.abc import AsyncGenerator, AsyncIterable, AsyncIterator, Iterable
 from dataclasses import dataclass
 from datetime import datetime, timezone
-
-from sqlalchemy import select
+from typing import Any
+
+from sqlalchemy import (
+    Row,
+    bindparam,
+    case,
+    delete,
+    func,
+    literal_column,
+    or_,
+    select,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from sqlalchemy import or_
-
-from ..db.models import Conversation, ConversationChunk, IndexStatus
+from ..config import get_settings
+from ..db.engine import copy_records
+from ..db.models import Conversation, ConversationChunk, IndexStatus, uuid7
 from .embedder import Embedder
-from .scanner import ConversationFile, ConversationScanner, chunk_content
+from .scanner import (
+    ConversationFile,
+    ConversationScanner,
+    chunk_content,
+    hash_content,
+)
 from .source import ConversationSource
 
 logger = logging.getLogger(__name__)
 
+# Conversations per INSERT ... ON CONFLICT statement
+UPSERT_BATCH_SIZE = 500
+
+# Embedded conversations per commit; bounds the work lost to a crash
+EMBED_COMMIT_SIZE = 100
+
+# Streamed batches read ahead of the one being indexed
+PREFETCH_BATCHES = 2
+
+# Leading characters of a conversation sent for its document embedding
+EMBEDDING_INPUT_CHARS = 8000  # OpenAI limit
+
+
+def _embedding_hash(content: str) -> str:
+    """Hash the part of the content that the document embedding covers."""
+    return hash_content(content[:EMBEDDING_INPUT_CHARS])
+
+
+# Column order for binary COPY into conversation_chunks
+CHUNK_COPY_COLUMNS = (
+    "id",
+    "conversation_id",
+    "chunk_index",
+    "content",
+    "content_hash",
+    "embedding",
+)
+
+
+async def aiter_files(
+    files: Iterable[ConversationFile],
+) -> AsyncIterator[ConversationFile]:
+    """Adapt a list of files to the async stream index_stream() consumes."""
+    for file in files:
+        yield file
+
+
+async def _abatched(
+    files: AsyncIterable[ConversationFile], size: int
+) -> AsyncGenerator[list[ConversationFile], None]:
+    """Group an async stream of files into lists of at most ``size``."""
+    try:
+        batch: list[ConversationFile] = []
+        async for file in files:
+            batch.append(file)
+            if len(batch) >= size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    finally:
+        # Release the source (e.g. a server-side cursor) if we stop early
+        if isinstance(files, AsyncGenerator):
+            await files.aclose()
+
+
+async def _prefetch(
+    batches: AsyncGenerator[list[ConversationFile], None], depth: int
+) -> AsyncGenerator[list[ConversationFile], None]:
+    """Iterate batches while a background task fetches up to ``depth`` ahead.
+
+    Lets the source read its next batch while the current one is being
+    embedded and written, instead of alternating between the two.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=depth)
+    done = object()
+
+    async def produce() -> None:
+        async with contextlib.aclosing(batches):
+            try:
+                async for batch in batches:
+                    await queue.put(batch)
+            finally:
+                # Never block here: a cancelled put means nobody is reading.
+                # If the queue is full the consumer sees the finished task
+                # once it has drained it.
+                with contextlib.suppress(asyncio.QueueFull):
+                    queue.put_nowait(done)
+
+    producer = asyncio.create_task(produce())
+    try:
+        while not (queue.empty() and producer.done()):
+            batch = await queue.get()
+            if batch is done:
+                break
+            yield batch
+        # Surface any error that ended the stream early
+        await producer
+    finally:
+        if not producer.done():
+            producer.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await producer
+
 
 @dataclass
 class IndexResult:
@@ -44,6 +158,8 @@ class ConversationIndexer:
         # Support both 'source' and deprecated 'scanner' parameter
         self.source = source or scanner or ConversationScanner()
         self.embedder = embedder or Embedder()
+        # Serializes use of the shared session between concurrent groups
+        self._session_lock = asyncio.Lock()
 
     async def index_all(self, force: bool = False) -> IndexResult:
         """Index all conversations across all projects."""
@@ -65,6 +181,92 @@ class ConversationIndexer:
         """
         return await self._index_files(files, force=force)
 
+    async def index_stream(
+        self, files: AsyncIterable[ConversationFile], force: bool = False
+    ) -> IndexResult:
+        """Index conversation files from an async stream.
+
+        Files are consumed in batches as they arrive, so a streaming source
+        is never fully materialized and fetching overlaps with embedding.
+        """
+        return await self._index_batches(
+            _prefetch(_abatched(files, UPSERT_BATCH_SIZE), PREFETCH_BATCHES),
+            force=force,
+        )
+
+    async def embed_pending(self) -> IndexResult:
+        """Embed conversations that are still missing an embedding.
+
+        Works from the content stored in the database, so rows cleared by a
+        model change or left behind by a failed run are filled in without
+        rescanning their sources. Pages by id through the partial
+        ix_conversations_pending_embed index.
+        """
+        result = IndexResult(
+            files_indexed=0,
+            files_updated=0,
+            files_skipped=0,
+            files_failed=0,
+            errors=[],
+        )
+        last_id: uuid.UUID | None = None
+
+        while True:
+            stmt = (
+                select(
+                    Conversation.id,
+                    Conversation.file_path,
+                    Conversation.project_name,
+                    Conversation.feature_name,
+                    Conversation.doc_type,
+                    Conversation.title,
+                    Conversation.content,
+                    Conversation.content_hash,
+                )
+                .where(Conversation.embedding.is_(None))
+                .order_by(Conversation.id)
+                .limit(EMBED_COMMIT_SIZE)
+            )
+            if last_id is not None:
+                stmt = stmt.where(Conversation.id > last_id)
+
+            rows = (await self.session.execute(stmt)).all()
+            if not rows:
+                break
+            # Advance past failures too, so a bad row can't stall the loop
+            last_id = rows[-1].id
+
+            pending = [
+                (
+                    row.id,
+                    ConversationFile(
+                        file_path=row.file_path,
+                        project_name=row.project_name,
+                        feature_name=row.feature_name,
+                        doc_type=row.doc_type,
+                        title=row.title,
+                        content=row.content,
+                        content_hash=row.content_hash,
+                    ),
+                    True,
+                )
+                for row in rows
+            ]
+            errors = await self._embed_conversations(pending)
+            for (_, file, _), error in zip(pending, errors):
+                if error is None:
+                    result.files_updated += 1
+                else:
+                    result.files_failed += 1
+                    error_msg = f"Failed to embed {file.file_path}: {error}"
+                    result.errors.append(error_msg)
+                    logger.error(error_msg)
+
+            # One commit per page of embeddings
+            await self.session.commit()
+
+        return result
+
     async def _index_files(
         self,
         files: list[ConversationFile],
@@ -72,6 +274,22 @@ class ConversationIndexer:
         project_name: str | None = None,
     ) -> IndexResult:
         """Index a list of conversation files."""
+        batches = (
+            files[start : start + UPSERT_BATCH_SIZE]
+            for start in range(0, len(files), UPSERT_BATCH_SIZE)
+        )
+        return await self._index_batches(
+            batches, force=force, project_name=project_name
+        )
+
+    async def _index_batches(
+        self,
+        batches: Iterable[list[ConversationFile]]
+        | AsyncGenerator[list[ConversationFile], None],
+        force: bool = False,
+        project_name: str | None = None,
+    ) -> IndexResult:
+        """Index batches of conversation files."""
         result = IndexResult(
             files_indexed=0,
             files_updated=0,
@@ -83,25 +301,14 @@ class ConversationIndexer:
         # Update status to indexing
         await self._update_status(project_name, "indexing")
 
-        for file in files:
-            try:
-                indexed = await self._index_file(file, force=force)
-                if indexed == "new":
-                    result.files_indexed += 1
-                    # Commit after each successful index to avoid losing work
-                    await self.session.commit()
-                elif indexed == "updated":
-                    result.files_updated += 1
-                    await self.session.commit()
-                else:
-                    result.files_skipped += 1
-            except Exception as e:
-                result.files_failed += 1
-                error_msg = f"Failed to index {file.file_path}: {e}"
-                result.errors.append(error_msg)
-                logger.error(error_msg)
-                # Rollback failed transaction so we can continue
-                await self.session.rollback()
+        if isinstance(batches, AsyncGenerator):
+            # Closing stops the prefetching producer if a batch raises
+            async with contextlib.aclosing(batches):
+                async for batch in batches:
+                    await self._index_batch(batch, result, force, project_name)
+        else:
+            for batch in batches:
+                await self._index_batch(batch, result, force, project_name)
 
         # Update final status
         await self._update_status(
@@ -112,117 +319,362 @@ class ConversationIndexer:
 
         return result
 
-    async def _index_file(
-        self, file: ConversationFile, force: bool = False
-    ) -> str:
-        """Index a single conversation file. Returns 'new', 'updated', or 'skipped'."""
-        # Determine source_id - for agent-progress sources, file_path is the source_id
-        source_id = None
-        if file.file_path.startswith("agent-progress:"):
-            source_id = file.file_path
-
-        # Check if file already exists by file_path or source_id
-        if source_id:
-            # For external sources, prefer source_id for deduplication
-            existing = await self.session.execute(
-                select(Conversation).where(
-                    or_(
-                        Conversation.source_id == source_id,
-                        Conversation.file_path == file.file_path,
-                    )
-                )
-            )
-        else:
-            existing = await self.session.execute(
-                select(Conversation).where(Conversation.file_path == file.file_path)
-            )
-        existing_conv = existing.scalar_one_or_none()
+    async def _index_batch(
+        self,
+        batch: list[ConversationFile],
+        result: IndexResult,
+        force: bool = False,
+        project_name: str | None = None,
+    ) -> None:
+        """Index one batch of files, accumulating counts into ``result``.
 
-        if existing_conv:
-            # Check if content changed
-            if not force and existing_conv.content_hash == file.content_hash:
-                return "skipped"
+        Embeddings are committed in groups of EMBED_COMMIT_SIZE, in the same
+        transaction as the running totals on IndexStatus.
+        """
+        try:
+            changed = await self._upsert_batch(batch, force=force)
+            await self.session.commit()
+        except Exception as e:
+            result.files_failed += len(batch)
+            error_msg = f"Failed to upsert batch of {len(batch)} files: {e}"
+            result.errors.append(error_msg)
+            logger.error(error_msg)
+            await self.session.rollback()
+            return
 
-            # Update existing conversation
-            await self._update_conversation(existing_conv, file, source_id)
-            return "updated"
-        else:
-            # Create new conversation
-            await self._create_conversation(file, source_id)
-            return "new"
-
-    async def _create_conversation(
-        self, file: ConversationFile, source_id: str | None = None
-    ) -> Conversation:
-        """Create a new conversation with chunks and embeddings."""
-        # Generate embedding for full content (truncated if needed)
-        content_for_embedding = file.content[:8000]  # OpenAI limit
-        embedding = await self.embedder.embed_text(content_for_embedding)
-
-        conv = Conversation(
-            file_path=file.file_path,
-            project_name=file.project_name,
-            feature_name=file.feature_name,
-            doc_type=file.doc_type,
-            title=file.title,
-            content=file.content,
-            content_hash=file.content_hash,
-            source_id=source_id,
-            embedding=embedding,
+        result.files_skipped += len(batch) - len(changed)
+
+        concurrency = asyncio.Semaphore(get_settings().index_concurrency)
+
+        async def embed_group(group: list[tuple[Row, ConversationFile]]) -> None:
+            async with concurrency:
+                # Forced runs re-embed everything (e.g. after a model change)
+                errors = await self._embed_conversations(
+                    [(row.id, file, row.stale) for row, file in group],
+                    reuse=not force,
+                )
+            for (row, file), error in zip(group, errors):
+                if error is None:
+                    if row.inserted:
+                        result.files_indexed += 1
+                    else:
+                        result.files_updated += 1
+                else:
+                    result.files_failed += 1
+                    error_msg = f"Failed to index {file.file_path}: {error}"
+                    result.errors.append(error_msg)
+                    logger.error(error_msg)
+
+            # Commits the group along with its progress
+            async with self._session_lock:
+                await self._update_status(project_name, "indexing", result)
+
+        # Groups overlap their OpenAI calls; session use is serialized
+        await asyncio.gather(
+            *(
+                embed_group(changed[start : start + EMBED_COMMIT_SIZE])
+                for start in range(0, len(changed), EMBED_COMMIT_SIZE)
+            )
         )
-        self.session.add(conv)
-        await self.session.flush()  # Get the ID
 
-        # Create chunks
-        await self._create_chunks(conv, file.content)
+    async def _upsert_batch(
+        self, files: list[ConversationFile], force: bool = False
+    ) -> list[tuple[Row, ConversationFile]]:
+        """Upsert a batch of conversations in a single statement.
+
+        Rows whose content is unchanged (and already embedded) are left
+        untouched unless ``force`` is set. Changed rows keep their document
+        embedding only if the embedded prefix of the content is unchanged;
+        otherwise it is cleared. Either way, a row whose chunk rebuild then
+        fails has its embedding cleared (see _mark_pending), so it is
+        retried on the next run. A hash mismatch with identical content (e.g. a row
+        hashed by an older algorithm) only refreshes the stored hashes.
+
+        Returns:
+            (row, file) pairs for the conversations whose chunks need
+            rebuilding. Each row carries ``id``, ``file_path``, ``inserted``
+            (False if updated) and ``stale`` (document embedding missing).
+        """
+        # Key by file_path so duplicates can't hit the same row twice
+        by_path = {file.file_path: file for file in files}
+        rows = [
+            {
+                "file_path": file.file_path,
+                "project_name": file.project_name,
+                "feature_name": file.feature_name,
+                "doc_type": file.doc_type,
+                "title": file.title,
+                "content": file.content,
+                "content_hash": file.content_hash,
+                "embedding_hash": _embedding_hash(file.content),
+                # For agent-progress sources, file_path is the source_id
+                "source_id": (
+                    file.file_path
+                    if file.file_path.startswith("agent-progress:")
+                    else None
+                ),
+            }
+            for file in by_path.values()
+        ]
+
+        # Parameters are passed executemany-style rather than via .values(rows):
+        # the statement compiles (and caches) once, and SQLAlchemy's
+        # insertmanyvalues folds the rows into multi-VALUES pages on the wire
+        stmt = insert(Conversation)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Conversation.file_path],
+            set_={
+                "project_name": stmt.excluded.project_name,
+                "feature_name": stmt.excluded.feature_name,
+                "doc_type": stmt.excluded.doc_type,
+                "title": stmt.excluded.title,
+                "content": stmt.excluded.content,
+                "content_hash": stmt.excluded.content_hash,
+                "embedding_hash": stmt.excluded.embedding_hash,
+                "source_id": stmt.excluded.source_id,
+                "embedding": None
+                if force
+                else case(
+                    (
+                        Conversation.embedding_hash == stmt.excluded.embedding_hash,
+                        Conversation.embedding,
+                    ),
+                    (
+                        # Rows from before embedding_hash existed
+                        Conversation.content == stmt.excluded.content,
+                        Conversation.embedding,
+                    ),
+                    else_=None,
+                ),
+                # Only real content changes advance updated_at, which lets
+                # RETURNING tell them apart from hash-only refreshes
+                "updated_at": case(
+                    (
+                        Conversation.content == stmt.excluded.content,
+                        Conversation.updated_at,
+                    ),
+                    else_=func.now(),
+                ),
+            },
+            where=None
+            if force
+            else or_(
+                Conversation.content_hash != stmt.excluded.content_hash,
+                Conversation.embedding.is_(None),
+            ),
+        ).returning(
+            Conversation.id,
+            Conversation.file_path,
+            literal_column("xmax = 0").label("inserted"),
+            Conversation.embedding.is_(None).label("stale"),
+            (Conversation.updated_at == func.now()).label("changed"),
+        )
 
-        return conv
+        # Core execution on the session's connection skips the ORM bulk path
+        conn = await self.session.connection()
+        upserted = await conn.execute(stmt, rows)
+        return [
+            (row, by_path[row.file_path])
+            for row in upserted
+            if row.stale or row.changed
+        ]
 
-    async def _update_conversation(
-        self, conv: Conversation, file: ConversationFile, source_id: str | None = None
-    ) -> None:
-        """Update an existing conversation."""
-        # Update metadata
-        conv.project_name = file.project_name
-        conv.feature_name = file.feature_name
-        conv.doc_type = file.doc_type
-        conv.title = file.title
-        conv.content = file.content
-        conv.content_hash = file.content_hash
-        conv.updated_at = datetime.now(timezone.utc)
-        if source_id:
-            conv.source_id = source_id
-
-        # Regenerate embedding
-        content_for_embedding = file.content[:8000]
-        conv.embedding = await self.embedder.embed_text(content_for_embedding)
+    async def _embed_conversations(
+        self,
+        pending: list[tuple[uuid.UUID, ConversationFile, bool]],
+        reuse: bool = True,
+    ) -> list[Exception | None]:
+        """Embed a group of conversations and rebuild their chunks.
+
+        ``pending`` holds (id, file, embed_document) triples; when
+        embed_document is False the stored document embedding is still
+        valid and only the chunks are rebuilt.
+
+        Every text still lacking an embedding across the whole group goes
+        to OpenAI in one embed_batch call, so requests are filled up to the
+        embedder's batch size instead of being issued per conversation.
+        With ``reuse`` set, embeddings already stored for identical input
+        (matched by hash) are copied instead of requested.
+
+        Returns:
+            Per conversation, None on success or the exception that failed it.
+        """
+        settings = get_settings()
+        doc_hashes = [
+            _embedding_hash(file.content) if embed_doc else None
+            for _, file, embed_doc in pending
+        ]
+        chunk_lists = []
+        for _, file, _ in pending:
+            chunks = chunk_content(
+                file.content, settings.chunk_size, settings.chunk_overlap
+            )
+            # No need for chunks if content fits in one
+            chunk_lists.append(chunks if len(chunks) > 1 else [])
+        chunk_hashes = [
+            [hash_content(chunk) for chunk in chunks] for chunks in chunk_lists
+        ]
+
+        doc_embeddings: dict[str, Any] = {}
+        chunk_embeddings: dict[str, Any] = {}
+        try:
+            if reuse:
+                async with self._session_lock:
+                    doc_embeddings = await self._stored_embeddings(
+                        Conversation.embedding_hash,
+                        Conversation.embedding,
+                        {h for h in doc_hashes if h},
+                    )
+                    chunk_embeddings = await self._stored_embeddings(
+                        ConversationChunk.content_hash,
+                        ConversationChunk.embedding,
+                        {h for hashes in chunk_hashes for h in hashes},
+                    )
 
-        # Delete old chunks and recreate
-        for chunk in conv.chunks:
-            await self.session.delete(chunk)
-        await self.session.flush()
+            # Texts still to embed, once per distinct hash
+            doc_texts = {
+                h: file.content[:EMBEDDING_INPUT_CHARS]
+                for (_, file, _), h in zip(pending, doc_hashes)
+                if h and h not in doc_embeddings
+            }
+            chunk_texts = {
+                h: chunk
+                for chunks, hashes in zip(chunk_lists, chunk_hashes)
+                for chunk, h in zip(chunks, hashes)
+                if h not in chunk_embeddings
+            }
+            texts = [*doc_texts.values(), *chunk_texts.values()]
+            if texts:
+                vectors = await self.embedder.embed_batch(texts)
+                doc_embeddings.update(zip(doc_texts, vectors[: len(doc_texts)]))
+                chunk_embeddings.update(zip(chunk_texts, vectors[len(doc_texts) :]))
+        except Exception as e:
+            # Nothing written yet; mark the rows for a retry
+            async with self._session_lock:
+                await self._mark_pending(pending)
+            return [e] * len(pending)
+
+        writes = [
+            (
+                conv_id,
+                (doc_hash, doc_embeddings[doc_hash]) if doc_hash else None,
+                [
+                    (uuid7(), conv_id, i, chunk, h, chunk_embeddings[h])
+                    for i, (chunk, h) in enumerate(zip(chunks, hashes))
+                ],
+            )
+            for (conv_id, _, _), doc_hash, chunks, hashes in zip(
+                pending, doc_hashes, chunk_lists, chunk_hashes
+            )
+        ]
 
-        await self._create_chunks(conv, file.content)
+        async with self._session_lock:
+            try:
+                async with self.session.begin_nested():
+                    await self._write_embeddings(writes)
+                return [None] * len(writes)
+            except Exception as e:
+                logger.warning(f"Group write failed ({e}); retrying one at a time")
+
+            errors: list[Exception | None] = []
+            for write in writes:
+                try:
+                    # A savepoint per conversation keeps one failure from
+                    # undoing the rest
+                    async with self.session.begin_nested():
+                        await self._write_embeddings([write])
+                    errors.append(None)
+                except Exception as e:
+                    errors.append(e)
+
+            await self._mark_pending(
+                [entry for entry, error in zip(pending, errors) if error]
+            )
+            return errors
 
-    async def _create_chunks(self, conv: Conversation, content: str) -> None:
-        """Create chunks for a conversation."""
-        chunks = chunk_content(content)
+    async def _mark_pending(
+        self, failed: list[tuple[uuid.UUID, ConversationFile, bool]]
+    ) -> None:
+        """Clear the document embedding of conversations whose chunks failed.
 
-        if len(chunks) <= 1:
-            # No need for chunks if content fits in one
+        The upsert has already committed their new content_hash, so a row
+        that kept its embedding would look up to date and never be retried.
+        A NULL embedding sends it back through the next run's upsert and
+        through embed_pending. Rows that were re-embedding their document
+        are NULL already.
+        """
+        conv_ids = [conv_id for conv_id, _, embed_doc in failed if not embed_doc]
+        if not conv_ids:
             return
+        conversations = Conversation.__table__
+        try:
+            async with self.session.begin_nested():
+                conn = await self.session.connection()
+                await conn.execute(
+                    update(conversations)
+                    .where(conversations.c.id.in_(conv_ids))
+                    .values(embedding=None)
+                )
+        except Exception as e:
+            logger.error(f"Failed to mark {len(conv_ids)} conversations for retry: {e}")
+
+    async def _write_embeddings(
+        self,
+        writes: list[tuple[uuid.UUID, tuple[str, Any] | None, list[tuple]]],
+    ) -> None:
+        """Store conversation embeddings and replace their chunks.
 
-        # Generate embeddings for all chunks
-        embeddings = await self.embedder.embed_batch(chunks)
+        Three statements regardless of group size: an executemany UPDATE,
+        one DELETE of the old chunks and one COPY of the new ones.
+        """
+        conn = await self.session.connection()
+        documents = [
+            {"conv_id": conv_id, "conv_hash": doc[0], "conv_embedding": doc[1]}
+            for conv_id, doc, _ in writes
+            if doc
+        ]
+        if documents:
+            conversations = Conversation.__table__
+            await conn.execute(
+                update(conversations)
+                .where(conversations.c.id == bindparam("conv_id"))
+                .values(
+                    embedding=bindparam("conv_embedding"),
+                    embedding_hash=bindparam("conv_hash"),
+                ),
+                documents,
+            )
 
-        for i, (chunk_text, embedding) in enumerate(zip(chunks, embeddings)):
-            chunk = ConversationChunk(
-                conversation_id=conv.id,
-                chunk_index=i,
-                content=chunk_text,
-                embedding=embedding,
+        # Delete old chunks and recreate
+        await conn.execute(
+            delete(ConversationChunk).where(
+                ConversationChunk.conversation_id.in_(
+                    [conv_id for conv_id, _, _ in writes]
+                )
             )
-            self.session.add(chunk)
+        )
+        records = [record for _, _, chunk_records in writes for record in chunk_records]
+        if records:
+            await copy_records(
+                self.session,
+                ConversationChunk.__tablename__,
+                CHUNK_COPY_COLUMNS,
+                records,
+            )
+
+    async def _stored_embeddings(
+        self, hash_column, embedding_column, hashes: set[str]
+    ) -> dict[str, Any]:
+        """Look up stored embeddings by hash in one query."""
+        if not hashes:
+            return {}
+        existing = await self.session.execute(
+            select(hash_column, embedding_column).where(
+                hash_column.in_(hashes),
+                embedding_column.isnot(None),
+            )
+        )
+        return dict(existing.tuples().all())
 
     async def _update_status(
         self,
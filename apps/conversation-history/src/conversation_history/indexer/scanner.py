@@ -1,10 +1,43 @@
 """Scanner for discovering conversation files."""
 
-import hashlib
+import os
 import re
+from collections.abc import Iterator
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 
+import xxhash
+
+# Doc type hints, one regex pass each. Alternatives are tried in order at
+# the start of the string, so an earlier hint wins wherever it appears
+_FILENAME_DOC_TYPE_RE = re.compile(
+    r"(?=.*?(checkpoint))|(?=.*?(instruction))|(?=.*?(readme))", re.DOTALL
+)
+_FILENAME_DOC_TYPES = ("checkpoint", "instructions", "docs")
+_PATH_DOC_TYPE_RE = re.compile(
+    r"(?=.*?(checkpoint))|(?=.*?(instruction))|(?=.*?(doc))", re.DOTALL
+)
+_PATH_DOC_TYPES = ("checkpoint", "instructions", "docs")
+
+# Markdown H1 heading at the start of a line
+_TITLE_RE = re.compile(r"^# (.*)$", re.MULTILINE)
+
+# Only this many leading lines are checked for a title
+TITLE_SCAN_LINES = 10
+
+
+def hash_content(content: str | bytes) -> str:
+    """Hash content for change detection.
+
+    Uses xxh3-128 (non-cryptographic, SIMD-accelerated); collision
+    resistance against adversaries isn't needed to detect edits. Text is
+    hashed as UTF-8, so hashing raw UTF-8 bytes gives the same digest.
+    """
+    if isinstance(content, str):
+        content = content.encode()
+    return xxhash.xxh3_128_hexdigest(content)
+
 
 @dataclass
 class ConversationFile:
@@ -19,6 +52,45 @@ class ConversationFile:
     content_hash: str
 
 
+def _iter_markdown_files(directory: Path) -> Iterator[Path]:
+    """Yield the .md files under a directory, like rglob("*.md").
+
+    Walks with os.scandir so entry types come from the directory read;
+    a Path is only built for matching files. Symlinked directories are
+    not descended into and unreadable directories are skipped.
+    """
+    try:
+        with os.scandir(directory) as it:
+            entries = list(it)
+    except PermissionError:
+        return
+
+    for entry in entries:
+        if entry.name.endswith(".md") and entry.is_file():
+            yield directory / entry.name
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            yield from _iter_markdown_files(directory / entry.name)
+
+
+@lru_cache(maxsize=4096)
+def _filename_doc_type(filename: str) -> str | None:
+    """Doc type implied by a filename, or None."""
+    match = _FILENAME_DOC_TYPE_RE.match(filename.lower())
+    return _FILENAME_DOC_TYPES[match.lastindex - 1] if match else None
+
+
+@lru_cache(maxsize=4096)
+def _path_doc_type(part: str) -> str | None:
+    """Doc type implied by a path component, or None.
+
+    Cached per component: directory names repeat across every file
+    beneath them.
+    """
+    match = _PATH_DOC_TYPE_RE.match(part.lower())
+    return _PATH_DOC_TYPES[match.lastindex - 1] if match else None
+
+
 class ConversationScanner:
     """Scans for conversation files in project directories.
 
@@ -35,10 +107,18 @@ class ConversationScanner:
 
     async def scan_all(self) -> list[ConversationFile]:
         """Scan all projects for conversation files."""
+        # scandir entries carry their type from the directory read, so
+        # listing projects needs no extra stat per entry
+        with os.scandir(self.projects_root) as entries:
+            project_names = [
+                entry.name
+                for entry in entries
+                if not entry.name.startswith(".") and entry.is_dir()
+            ]
+
         files = []
-        for project_dir in self.projects_root.iterdir():
-            if project_dir.is_dir() and not project_dir.name.startswith("."):
-                files.extend(await self.scan_project(project_dir.name))
+        for project_name in project_names:
+            files.extend(await self.scan_project(project_name))
         return files
 
     async def scan_project(self, project_name: str) -> list[ConversationFile]:
@@ -50,7 +130,7 @@ class ConversationScanner:
             return []
 
         files = []
-        for file_path in conversation_dir.rglob("*.md"):
+        for file_path in _iter_markdown_files(conversation_dir):
             try:
                 conv_file = self._parse_file(file_path, project_name)
                 if conv_file:
@@ -63,20 +143,28 @@ class ConversationScanner:
 
     def _parse_file(self, file_path: Path, project_name: str) -> ConversationFile | None:
         """Parse a conversation file and extract metadata."""
+        raw = file_path.read_bytes()
+
+        # Remove null bytes that PostgreSQL doesn't accept
+        if b"\x00" in raw:
+            raw = raw.replace(b"\x00", b"")
+
+        # Translate line endings as read_text() did, so content and hashes
+        # match those stored before files were read as bytes
+        if b"\r" in raw:
+            raw = raw.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+
         try:
-            content = file_path.read_text(encoding="utf-8")
+            content = raw.decode("utf-8")
         except UnicodeDecodeError:
             # Try with latin-1 as fallback
-            content = file_path.read_text(encoding="latin-1")
-
-        # Remove null bytes that PostgreSQL doesn't accept
-        content = content.replace("\x00", "")
+            content = raw.decode("latin-1")
 
         if not content.strip():
             return None
 
-        # Calculate content hash for change detection
-        content_hash = hashlib.sha256(content.encode()).hexdigest()
+        # Hash the bytes as read instead of re-encoding the decoded text
+        content_hash = hash_content(raw)
 
         # Determine doc_type and feature_name from path
         relative_path = file_path.relative_to(
@@ -100,24 +188,15 @@ class ConversationScanner:
 
     def _determine_doc_type(self, filename: str, path_parts: list[str]) -> str:
         """Determine document type from filename and path."""
-        filename_lower = filename.lower()
-
-        if "checkpoint" in filename_lower:
-            return "checkpoint"
-        if "instruction" in filename_lower or filename_lower == "instructions.md":
-            return "instructions"
-        if "readme" in filename_lower:
-            return "docs"
+        doc_type = _filename_doc_type(filename)
+        if doc_type:
+            return doc_type
 
         # Check path parts for doc type hints
         for part in path_parts:
-            part_lower = part.lower()
-            if "checkpoint" in part_lower:
-                return "checkpoint"
-            if "instruction" in part_lower:
-                return "instructions"
-            if "doc" in part_lower:
-                return "docs"
+            doc_type = _path_doc_type(part)
+            if doc_type:
+                return doc_type
 
         return "other"
 
@@ -133,11 +212,18 @@ class ConversationScanner:
 
     def _extract_title(self, content: str, filename: str) -> str | None:
         """Extract title from content or filename."""
+        # Find where the leading lines end without splitting the whole file
+        end = -1
+        for _ in range(TITLE_SCAN_LINES):
+            end = content.find("\n", end + 1)
+            if end == -1:
+                end = len(content)
+                break
+
         # Try to find first markdown heading
-        lines = content.split("\n")
-        for line in lines[:10]:  # Check first 10 lines
-            if line.startswith("# "):
-                return line[2:].strip()
+        match = _TITLE_RE.search(content, 0, end)
+        if match:
+            return match.group(1).strip()
 
         # Fall back to filename without extension
         return Path(filename).stem.replace("-", " ").replace("_", " ").title()
@@ -147,24 +233,30 @@ def chunk_content(
     content: str, chunk_size: int = 3000, overlap: int = 500
 ) -> list[str]:
     """Split content into overlapping chunks for better embedding."""
-    if len(content) <= chunk_size:
+    length = len(content)
+    if length <= chunk_size:
         return [content]
 
+    # Look for paragraph breaks within the last 20% of each chunk
+    lookback = int(chunk_size * 0.2)
     chunks = []
     start = 0
 
-    while start < len(content):
+    while start < length:
         end = start + chunk_size
 
         # Try to break at paragraph boundary
-        if end < len(content):
-            # Look for paragraph break within last 20% of chunk
-            search_start = end - int(chunk_size * 0.2)
-            paragraph_break = content.rfind("\n\n", search_start, end)
+        if end < length:
+            # rfind is bounded to the lookback window, so the scan over the
+            # whole document stays linear
+            paragraph_break = content.rfind("\n\n", end - lookback, end)
             if paragraph_break > start:
                 end = paragraph_break
 
-        chunks.append(content[start:end].strip())
+        # strip() hands back the slice itself when there is nothing to trim
+        chunk = content[start:end].strip()
+        if chunk:  # Skip empty chunks
+            chunks.append(chunk)
         prev_start = start
         start = end - overlap
 
@@ -172,4 +264,4 @@ def chunk_content(
         if start <= prev_start:
             start = end
 
-    return [c for c in chunks if c]  # Remove empty chunks
+    return chunks
@@ -7,8 +7,8 @@ from contextlib import asynccontextmanager
 
 from mcp.server.fastmcp import FastMCP
 
-from ..config import settings
-from ..db import AsyncSessionLocal
+from ..config import get_settings
+from ..db import get_session_factory
 
 logger = logging.getLogger(__name__)
 
@@ -24,7 +24,7 @@ def create_mcp_server(host: str = "127.0.0.1", port: int = 8000) -> FastMCP:
 
     @asynccontextmanager
     async def get_session():
-        async with AsyncSessionLocal() as session:
+        async with get_session_factory()() as session:
             try:
                 yield session
                 await session.commit()
@@ -54,32 +54,48 @@ def get_mcp_server() -> FastMCP:
     """Get or create the MCP server instance."""
     global _mcp_server
     if _mcp_server is None:
-        host = os.getenv("FASTMCP_HOST", "127.0.0.1")
+        # In a pod the server must be reachable from the Service
+        default_host = "0.0.0.0" if _in_kubernetes() else "127.0.0.1"
+        host = os.getenv("FASTMCP_HOST", default_host)
         port = int(os.getenv("FASTMCP_PORT", "8000"))
         _mcp_server = create_mcp_server(host=host, port=port)
     return _mcp_server
 
 
+def _in_kubernetes() -> bool:
+    """Whether we are running inside a Kubernetes pod."""
+    return "KUBERNETES_SERVICE_HOST" in os.environ
+
+
+def _default_transport() -> str:
+    """Transport used when MCP_TRANSPORT is unset.
+
+    stdio serves one client over one pipe, so its requests cannot overlap;
+    it is kept for local CLI use. Server deployments get streamable-http,
+    where concurrent tool calls share the pooled database connections.
+    """
+    return "streamable-http" if _in_kubernetes() else "stdio"
 
 
 def main():
     """Entry point for the MCP server.
 
     Supports stdio (default), streamable-http (recommended for K8s), and sse (deprecated).
-    Set MCP_TRANSPORT=streamable-http for HTTP mode (used in K8s).
+    Set MCP_TRANSPORT=streamable-http for HTTP mode; it is also the default
+    when running inside Kubernetes.
 
     For HTTP transports, host/port are configured via FASTMCP_HOST and FASTMCP_PORT
     environment variables (defaults: 0.0.0.0:8000).
     """
     logging.basicConfig(
-        level=logging.INFO if settings.debug else logging.WARNING,
+        level=logging.INFO if get_settings().debug else logging.WARNING,
         format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
         stream=sys.stderr,
     )
 
     mcp_server = get_mcp_server()
 
-    transport = os.getenv("MCP_TRANSPORT", "stdio")
+    transport = os.getenv("MCP_TRANSPORT", _default_transport())
     if transport in ("streamable-http", "http"):
         # Streamable HTTP transport for K8s deployment (recommended)
         # Claude Code and modern MCP clients use this protocol
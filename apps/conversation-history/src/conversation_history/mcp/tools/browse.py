@@ -1,98 +1,200 @@
 """Browse tools for listing and retrieving conversations."""
 
+import base64
+import binascii
+import uuid
 from datetime import datetime, timedelta, timezone
 
 from mcp.server.fastmcp import FastMCP
-from sqlalchemy import distinct, func, select
-from sqlalchemy.orm import selectinload
+from sqlalchemy import BigInteger, cast, distinct, func, select, tuple_
 
-from ...db.models import Conversation
+from ...cache import async_ttl_cache
+from ...db import retry_on_disconnect
+from ...db.models import Conversation, ConversationChunk
+
+# Rows fetched per round trip when streaming unbounded listings
+STREAM_BATCH_SIZE = 500
+
+
+def _next_offset(offset: int, returned: int, total: int) -> int | None:
+    """Offset of the next page, or None once every group has been returned."""
+    return offset + returned if returned and offset + returned < total else None
+
+
+def _encode_cursor(indexed_at: datetime, conversation_id: uuid.UUID) -> str:
+    """Encode a keyset position as an opaque page cursor."""
+    raw = f"{indexed_at.isoformat()}|{conversation_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    """Decode a page cursor back to its (indexed_at, id) position.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        indexed_at, conversation_id = raw.split("|")
+        return datetime.fromisoformat(indexed_at), uuid.UUID(conversation_id)
+    except (binascii.Error, UnicodeDecodeError) as e:
+        raise ValueError(str(e)) from e
+
+
+def _next_cursor(last_row, returned: int, limit: int | None) -> str | None:
+    """Cursor for the page ending at ``last_row``, or None if it was the last."""
+    if not limit or returned < limit or last_row.indexed_at is None:
+        return None
+    return _encode_cursor(last_row.indexed_at, last_row.id)
 
 
 def register_browse_tools(mcp: FastMCP, get_session):
     """Register browse tools with the MCP server."""
 
     @mcp.tool()
-    async def list_projects() -> dict:
-        """List all indexed projects with conversation counts."""
+    @async_ttl_cache
+    @retry_on_disconnect
+    async def list_projects(limit: int = 100, offset: int = 0) -> dict:
+        """List indexed projects with conversation counts, largest first.
+
+        Args:
+            limit: Maximum projects to return (default 100)
+            offset: Number of projects to skip, for paging (default 0)
+        """
         async with get_session() as session:
+            # ORDER BY names the label, so the aggregate is written once
+            count = func.count(Conversation.id).label("count")
             stmt = (
                 select(
                     Conversation.project_name,
-                    func.count(Conversation.id).label("count"),
+                    count,
+                    # Window totals are taken over every group before LIMIT
+                    func.count().over().label("total_projects"),
+                    cast(func.sum(count).over(), BigInteger).label(
+                        "total_conversations"
+                    ),
                 )
                 .group_by(Conversation.project_name)
-                .order_by(func.count(Conversation.id).desc())
+                .order_by(count.desc(), Conversation.project_name)
+                .limit(limit)
+                .offset(offset)
             )
 
+            # Build the response straight from the result rows
             result = await session.execute(stmt)
             rows = result.all()
-
-            projects = []
-            total_count = 0
-            for row in rows:
-                projects.append({
+            projects = [
+                {
                     "project_name": row.project_name,
                     "conversation_count": row.count,
-                })
-                total_count += row.count
+                }
+                for row in rows
+            ]
 
+            if rows:
+                total = rows[0].total_projects
+                total_conversations = rows[0].total_conversations
+            else:
+                # Past the last page the window totals have no row to ride
+                # on, so count the groups directly
+                totals = await session.execute(
+                    select(
+                        func.count(distinct(Conversation.project_name)),
+                        func.count(Conversation.id),
+                    )
+                )
+                total, total_conversations = totals.one()
             return {
-                "total_projects": len(projects),
-                "total_conversations": total_count,
+                "total_projects": total,
+                "total_conversations": total_conversations,
                 "projects": projects,
+                "next_offset": _next_offset(offset, len(rows), total),
             }
 
     @mcp.tool()
-    async def list_features(project: str) -> dict:
+    @async_ttl_cache
+    @retry_on_disconnect
+    async def list_features(project: str, limit: int = 100, offset: int = 0) -> dict:
         """List features/topics within a project.
 
         Args:
             project: Project name to list features for
+            limit: Maximum features to return (default 100)
+            offset: Number of features to skip, for paging (default 0)
         """
         async with get_session() as session:
+            count = func.count(Conversation.id).label("count")
             stmt = (
                 select(
                     Conversation.feature_name,
-                    func.count(Conversation.id).label("count"),
+                    count,
+                    func.count().over().label("total_features"),
                 )
                 .where(Conversation.project_name == project)
                 .group_by(Conversation.feature_name)
-                .order_by(func.count(Conversation.id).desc())
+                .order_by(count.desc(), Conversation.feature_name)
+                .limit(limit)
+                .offset(offset)
             )
 
             result = await session.execute(stmt)
             rows = result.all()
-
-            features = []
-            for row in rows:
-                features.append({
+            features = [
+                {
                     "feature_name": row.feature_name or "(root)",
                     "conversation_count": row.count,
-                })
+                }
+                for row in rows
+            ]
 
+            if rows:
+                total = rows[0].total_features
+            else:
+                # feature_name is NULL for root conversations, which
+                # count(DISTINCT) would skip, so count the groups instead
+                groups = (
+                    select(Conversation.feature_name)
+                    .where(Conversation.project_name == project)
+                    .group_by(Conversation.feature_name)
+                    .subquery()
+                )
+                total = await session.scalar(
+                    select(func.count()).select_from(groups)
+                )
             return {
                 "project": project,
-                "total_features": len(features),
+                "total_features": total,
                 "features": features,
+                "next_offset": _next_offset(offset, len(rows), total),
             }
 
     @mcp.tool()
+    @retry_on_disconnect
     async def list_checkpoints(
         project: str | None = None,
         days: int = 30,
+        limit: int | None = None,
+        cursor: str | None = None,
     ) -> dict:
         """List recent checkpoint conversations.
 
         Args:
             project: Filter by project name (optional)
             days: Number of days to look back (default 30)
+            limit: Maximum results per page (optional, all if not specified)
+            cursor: next_cursor from the previous page (optional)
         """
+        try:
+            after = _decode_cursor(cursor) if cursor else None
+        except ValueError:
+            return {"error": f"Invalid cursor: {cursor}"}
+
         async with get_session() as session:
             cutoff = datetime.now(timezone.utc) - timedelta(days=days)
 
             stmt = (
                 select(
+                    Conversation.id,
                     Conversation.file_path,
                     Conversation.project_name,
                     Conversation.feature_name,
@@ -101,17 +203,26 @@ def register_browse_tools(mcp: FastMCP, get_session):
                 )
                 .where(Conversation.doc_type == "checkpoint")
                 .where(Conversation.indexed_at >= cutoff)
-                .order_by(Conversation.indexed_at.desc())
+                .order_by(Conversation.indexed_at.desc(), Conversation.id.desc())
+                .limit(limit)
             )
 
             if project:
                 stmt = stmt.where(Conversation.project_name == project)
+            if after:
+                stmt = stmt.where(
+                    tuple_(Conversation.indexed_at, Conversation.id) < after
+                )
 
-            result = await session.execute(stmt)
-            rows = result.all()
-
+            # The time window is unbounded, so stream through a server-side
+            # cursor and convert each row as it arrives instead of buffering
+            # the result rows
+            result = await session.stream(
+                stmt.execution_options(yield_per=STREAM_BATCH_SIZE)
+            )
             checkpoints = []
-            for row in rows:
+            last_row = None
+            async for row in result:
                 checkpoints.append({
                     "file_path": row.file_path,
                     "project_name": row.project_name,
@@ -119,15 +230,18 @@ def register_browse_tools(mcp: FastMCP, get_session):
                     "title": row.title,
                     "indexed_at": row.indexed_at.isoformat() if row.indexed_at else None,
                 })
+                last_row = row
 
             return {
                 "days": days,
                 "project": project,
                 "count": len(checkpoints),
                 "checkpoints": checkpoints,
+                "next_cursor": _next_cursor(last_row, len(checkpoints), limit),
             }
 
     @mcp.tool()
+    @retry_on_disconnect
     async def get_conversation(file_path: str) -> dict:
         """Get full content and metadata for a conversation.
 
@@ -135,13 +249,28 @@ def register_browse_tools(mcp: FastMCP, get_session):
             file_path: Path to the conversation file
         """
         async with get_session() as session:
-            stmt = (
-                select(Conversation)
-                .options(selectinload(Conversation.chunks))
-                .where(Conversation.file_path == file_path)
+            # Count chunks in SQL rather than loading them (content and
+            # embeddings) just to take len()
+            chunk_count = (
+                select(func.count(ConversationChunk.id))
+                .where(ConversationChunk.conversation_id == Conversation.id)
+                .correlate(Conversation)
+                .scalar_subquery()
             )
+            stmt = select(
+                Conversation.file_path,
+                Conversation.project_name,
+                Conversation.feature_name,
+                Conversation.doc_type,
+                Conversation.title,
+                Conversation.content,
+                Conversation.indexed_at,
+                Conversation.updated_at,
+                Conversation.embedding.isnot(None).label("has_embedding"),
+                chunk_count.label("chunk_count"),
+            ).where(Conversation.file_path == file_path)
             result = await session.execute(stmt)
-            conv = result.scalar_one_or_none()
+            conv = result.one_or_none()
 
             if not conv:
                 return {
@@ -158,15 +287,17 @@ def register_browse_tools(mcp: FastMCP, get_session):
                 "content": conv.content,
                 "indexed_at": conv.indexed_at.isoformat() if conv.indexed_at else None,
                 "updated_at": conv.updated_at.isoformat() if conv.updated_at else None,
-                "has_embedding": conv.embedding is not None,
-                "chunk_count": len(conv.chunks) if conv.chunks else 0,
+                "has_embedding": conv.has_embedding,
+                "chunk_count": conv.chunk_count,
             }
 
     @mcp.tool()
+    @retry_on_disconnect
     async def list_by_type(
         doc_type: str,
         project: str | None = None,
         limit: int = 20,
+        cursor: str | None = None,
     ) -> dict:
         """List conversations by document type.
 
@@ -174,10 +305,17 @@ def register_browse_tools(mcp: FastMCP, get_session):
             doc_type: Document type to filter by (checkpoint, instructions, docs, other)
             project: Filter by project name (optional)
             limit: Maximum results to return (default 20)
+            cursor: next_cursor from the previous page (optional)
         """
+        try:
+            after = _decode_cursor(cursor) if cursor else None
+        except ValueError:
+            return {"error": f"Invalid cursor: {cursor}"}
+
         async with get_session() as session:
             stmt = (
                 select(
+                    Conversation.id,
                     Conversation.file_path,
                     Conversation.project_name,
                     Conversation.feature_name,
@@ -185,29 +323,36 @@ def register_browse_tools(mcp: FastMCP, get_session):
                     Conversation.indexed_at,
                 )
                 .where(Conversation.doc_type == doc_type)
-                .order_by(Conversation.indexed_at.desc())
+                .order_by(Conversation.indexed_at.desc(), Conversation.id.desc())
                 .limit(limit)
             )
 
             if project:
                 stmt = stmt.where(Conversation.project_name == project)
+            if after:
+                stmt = stmt.where(
+                    tuple_(Conversation.indexed_at, Conversation.id) < after
+                )
 
             result = await session.execute(stmt)
             rows = result.all()
-
-            conversations = []
-            for row in rows:
-                conversations.append({
+            conversations = [
+                {
                     "file_path": row.file_path,
                     "project_name": row.project_name,
                     "feature_name": row.feature_name,
                     "title": row.title,
                     "indexed_at": row.indexed_at.isoformat() if row.indexed_at else None,
-                })
+                }
+                for row in rows
+            ]
 
             return {
                 "doc_type": doc_type,
                 "project": project,
                 "count": len(conversations),
                 "conversations": conversations,
+                "next_cursor": _next_cursor(
+                    rows[-1] if rows else None, len(rows), limit
+                ),
             }
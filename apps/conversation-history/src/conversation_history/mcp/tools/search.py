@@ -1,16 +1,92 @@
 """Search tools for conversation history."""
 
+from collections import OrderedDict
+
 from mcp.server.fastmcp import FastMCP
 from pgvector.sqlalchemy import Vector
-from sqlalchemy import func, select, or_, text
+from sqlalchemy import cast, func, select, true
+from sqlalchemy.dialects.postgresql import REGCONFIG
+from sqlalchemy.orm import aliased
 
+from ...config import get_settings
+from ...db import retry_on_disconnect
 from ...db.models import Conversation, ConversationChunk
+from ...indexer.embedder import Embedder, EmbeddingBatcher
+
+# Created lazily by _get_embedder() / _get_batcher()
+_embedder: Embedder | None = None
+_batcher: EmbeddingBatcher | None = None
+
+# Recent query embeddings, least recently used first
+QUERY_EMBEDDING_CACHE_SIZE = 1024
+_query_embeddings: OrderedDict[tuple[str, int, str], list[float]] = OrderedDict()
+
+
+def _get_embedder() -> Embedder:
+    """Return the shared query embedder, creating it on first use.
+
+    One instance keeps one OpenAI client, so its HTTP connection pool (and
+    TLS sessions) carries over between searches.
+    """
+    global _embedder
+    if _embedder is None:
+        _embedder = Embedder()
+    return _embedder
+
+
+def _get_batcher() -> EmbeddingBatcher:
+    """Return the shared batcher that groups concurrent query embeddings."""
+    global _batcher
+    if _batcher is None:
+        _batcher = EmbeddingBatcher(_get_embedder())
+    return _batcher
+
+
+async def _embed_query(query: str) -> list[float]:
+    """Embed a search query, reusing the vector for repeated queries.
+
+    Keyed on model and dimensions too, so a configuration change never
+    serves a vector from the old embedding space. Whitespace is collapsed
+    before embedding so trivially different spellings share an entry.
+    """
+    embedder = _get_embedder()
+    text = " ".join(query.split())
+    key = (embedder.model, embedder.dimensions, text)
+
+    embedding = _query_embeddings.get(key)
+    if embedding is not None:
+        _query_embeddings.move_to_end(key)
+        return embedding
+
+    embedding = await _get_batcher().submit(text)
+    _query_embeddings[key] = embedding
+    if len(_query_embeddings) > QUERY_EMBEDDING_CACHE_SIZE:
+        _query_embeddings.popitem(last=False)
+    return embedding
+
+
+async def _set_hnsw_options(session) -> None:
+    """Apply HNSW search settings for the current transaction.
+
+    Iterative scans (pgvector >= 0.8) keep walking the graph until enough
+    rows pass any WHERE clause on an index scan, instead of filtering a
+    single ef_search-sized candidate list down to fewer than ``limit``
+    results. Project/doc_type filtered searches skip the index entirely.
+    """
+    settings = get_settings()
+    await session.execute(
+        select(
+            func.set_config("hnsw.ef_search", str(settings.hnsw_ef_search), True),
+            func.set_config("hnsw.iterative_scan", settings.hnsw_iterative_scan, True),
+        )
+    )
 
 
 def register_search_tools(mcp: FastMCP, get_session):
     """Register search tools with the MCP server."""
 
     @mcp.tool()
+    @retry_on_disconnect
     async def search_conversations(
         query: str,
         project: str | None = None,
@@ -25,39 +101,60 @@ def register_search_tools(mcp: FastMCP, get_session):
             doc_type: Filter by document type: checkpoint, instructions, docs, other (optional)
             limit: Maximum results to return (default 10)
         """
-        from ...indexer.embedder import Embedder
-
         try:
             # Generate embedding for query
-            embedder = Embedder()
-            query_embedding = await embedder.embed_text(query)
+            query_embedding = await _embed_query(query)
 
             async with get_session() as session:
+                await _set_hnsw_options(session)
+
                 # Build vector similarity search query
                 # Using cosine distance (1 - cosine_similarity)
-                distance = Conversation.embedding.cosine_distance(query_embedding)
+                source = Conversation
+                filters = [Conversation.embedding.isnot(None)]
+                if project:
+                    filters.append(Conversation.project_name == project)
+                if doc_type:
+                    filters.append(Conversation.doc_type == doc_type)
+
+                if project or doc_type:
+                    # Narrow to the matching rows through the btree indexes
+                    # first, then rank that set exactly. MATERIALIZED keeps
+                    # the planner from folding the filters back into an HNSW
+                    # scan that would discard most of its candidates
+                    source = (
+                        select(
+                            Conversation.id,
+                            Conversation.file_path,
+                            Conversation.project_name,
+                            Conversation.feature_name,
+                            Conversation.doc_type,
+                            Conversation.title,
+                            Conversation.embedding,
+                        )
+                        .where(*filters)
+                        .cte("candidates")
+                        .prefix_with("MATERIALIZED")
+                    ).c
+                    filters = []
+
+                distance = source.embedding.cosine_distance(query_embedding)
 
                 stmt = (
                     select(
-                        Conversation.id,
-                        Conversation.file_path,
-                        Conversation.project_name,
-                        Conversation.feature_name,
-                        Conversation.doc_type,
-                        Conversation.title,
+                        source.id,
+                        source.file_path,
+                        source.project_name,
+                        source.feature_name,
+                        source.doc_type,
+                        source.title,
                         distance.label("distance"),
                     )
-                    .where(Conversation.embedding.isnot(None))
+                    .where(*filters)
                     .order_by(distance)
                     .limit(limit)
                 )
 
-                # Apply filters
-                if project:
-                    stmt = stmt.where(Conversation.project_name == project)
-                if doc_type:
-                    stmt = stmt.where(Conversation.doc_type == doc_type)
-
                 result = await session.execute(stmt)
                 rows = result.all()
 
@@ -88,6 +185,7 @@ def register_search_tools(mcp: FastMCP, get_session):
             }
 
     @mcp.tool()
+    @retry_on_disconnect
     async def find_similar(
         file_path: str,
         limit: int = 5,
@@ -98,47 +196,75 @@ def register_search_tools(mcp: FastMCP, get_session):
             file_path: Path to the reference conversation file
             limit: Maximum results to return (default 5)
         """
+        # The reference's embedding is read by an uncorrelated subquery, so
+        # it never leaves the server and the HNSW scan sees a constant
+        ref_embedding = (
+            select(Conversation.embedding)
+            .where(Conversation.file_path == file_path)
+            .scalar_subquery()
+            .correlate(None)
+        )
+        reference = (
+            select(
+                Conversation.title,
+                Conversation.embedding.isnot(None).label("has_embedding"),
+            )
+            .where(Conversation.file_path == file_path)
+            .subquery("reference")
+        )
+
+        other = aliased(Conversation, name="other")
+        distance = other.embedding.cosine_distance(ref_embedding)
+        similar = (
+            select(
+                other.file_path,
+                other.project_name,
+                other.feature_name,
+                other.doc_type,
+                other.title,
+                distance.label("distance"),
+            )
+            .where(reference.c.has_embedding)  # Skip the scan if unembedded
+            .where(other.embedding.isnot(None))
+            .where(other.file_path != file_path)  # Exclude reference
+            .order_by(distance)
+            .limit(limit)
+            .lateral("similar")
+        )
+
+        # One row per match, or a single row with NULL matches; no row at
+        # all means the reference isn't indexed
+        stmt = (
+            select(
+                reference.c.title.label("reference_title"),
+                reference.c.has_embedding,
+                similar,
+            )
+            .select_from(reference.outerjoin(similar, true()))
+            .order_by(similar.c.distance)
+        )
+
         async with get_session() as session:
-            # Get the reference document
-            stmt = select(Conversation).where(Conversation.file_path == file_path)
+            await _set_hnsw_options(session)
             result = await session.execute(stmt)
-            reference = result.scalar_one_or_none()
+            rows = result.all()
 
-            if not reference:
+            if not rows:
                 return {
                     "error": f"File not found in index: {file_path}",
                     "help": "Run trigger_index() to index the file first.",
                 }
 
-            if reference.embedding is None:
+            if not rows[0].has_embedding:
                 return {
                     "error": "Reference file has no embedding.",
                     "help": "Run trigger_index(force=True) to regenerate embeddings.",
                 }
 
-            # Find similar documents
-            distance = Conversation.embedding.cosine_distance(reference.embedding)
-
-            stmt = (
-                select(
-                    Conversation.file_path,
-                    Conversation.project_name,
-                    Conversation.feature_name,
-                    Conversation.doc_type,
-                    Conversation.title,
-                    distance.label("distance"),
-                )
-                .where(Conversation.embedding.isnot(None))
-                .where(Conversation.file_path != file_path)  # Exclude reference
-                .order_by(distance)
-                .limit(limit)
-            )
-
-            result = await session.execute(stmt)
-            rows = result.all()
-
             results = []
             for row in rows:
+                if row.file_path is None:  # Reference has no neighbours
+                    continue
                 similarity = 1 - row.distance
                 results.append({
                     "file_path": row.file_path,
@@ -151,14 +277,15 @@ def register_search_tools(mcp: FastMCP, get_session):
 
             return {
                 "reference": {
-                    "file_path": reference.file_path,
-                    "title": reference.title,
+                    "file_path": file_path,
+                    "title": rows[0].reference_title,
                 },
                 "count": len(results),
                 "results": results,
             }
 
     @mcp.tool()
+    @retry_on_disconnect
     async def keyword_search(
         keywords: str,
         project: str | None = None,
@@ -174,8 +301,9 @@ def register_search_tools(mcp: FastMCP, get_session):
             limit: Maximum results to return (default 10)
         """
         async with get_session() as session:
-            # Simple ILIKE search for keywords
-            search_pattern = f"%{keywords}%"
+            # Full-text match on the GIN-indexed tsvector, best matches first
+            ts_query = func.plainto_tsquery(cast("english", REGCONFIG), keywords)
+            rank = func.ts_rank_cd(Conversation.content_tsv, ts_query)
 
             stmt = (
                 select(
@@ -185,13 +313,8 @@ def register_search_tools(mcp: FastMCP, get_session):
                     Conversation.doc_type,
                     Conversation.title,
                 )
-                .where(
-                    or_(
-                        Conversation.content.ilike(search_pattern),
-                        Conversation.title.ilike(search_pattern),
-                    )
-                )
-                .order_by(Conversation.updated_at.desc())
+                .where(Conversation.content_tsv.bool_op("@@")(ts_query))
+                .order_by(rank.desc(), Conversation.updated_at.desc())
                 .limit(limit)
             )
 
@@ -1,8 +1,12 @@
 """Sync tools for indexing conversations."""
 
+import asyncio
+
 from mcp.server.fastmcp import FastMCP
-from sqlalchemy import func, select
+from sqlalchemy import func, select, tuple_
 
+from ...cache import async_ttl_cache, invalidate_all
+from ...db import retry_on_disconnect
 from ...db.models import Conversation, IndexStatus
 
 
@@ -20,9 +24,11 @@ def register_sync_tools(mcp: FastMCP, get_session):
             project: Index only this project (optional, indexes all if not specified)
             force: Force re-indexing even if content hasn't changed (default False)
         """
-        from ...config import settings
+        from ...config import get_settings
         from ...indexer import ConversationIndexer, ConversationScanner
 
+        settings = get_settings()
+
         if not settings.has_openai:
             return {
                 "success": False,
@@ -36,10 +42,15 @@ def register_sync_tools(mcp: FastMCP, get_session):
             async with get_session() as session:
                 indexer = ConversationIndexer(session, scanner=scanner)
 
-                if project:
-                    result = await indexer.index_project(project, force=force)
-                else:
-                    result = await indexer.index_all(force=force)
+                try:
+                    if project:
+                        result = await indexer.index_project(project, force=force)
+                    else:
+                        result = await indexer.index_all(force=force)
+                finally:
+                    # Batches commit as they go, so drop cached counts even
+                    # if indexing stopped partway
+                    invalidate_all()
 
                 return {
                     "success": result.files_failed == 0,
@@ -59,74 +70,81 @@ def register_sync_tools(mcp: FastMCP, get_session):
             }
 
     @mcp.tool()
+    @async_ttl_cache
+    @retry_on_disconnect
     async def get_index_status() -> dict:
         """Get current indexing statistics and status."""
-        async with get_session() as session:
-            # Get overall counts
-            total_stmt = select(func.count(Conversation.id))
-            total_result = await session.execute(total_stmt)
-            total_count = total_result.scalar() or 0
 
-            embedded_stmt = select(func.count(Conversation.id)).where(
-                Conversation.embedding.isnot(None)
-            )
-            embedded_result = await session.execute(embedded_stmt)
-            embedded_count = embedded_result.scalar() or 0
-
-            # Get per-project counts
-            project_stmt = (
-                select(
-                    Conversation.project_name,
-                    func.count(Conversation.id).label("count"),
-                )
-                .group_by(Conversation.project_name)
-                .order_by(func.count(Conversation.id).desc())
+        async def query(stmt, consume):
+            # Each query runs on its own pooled connection
+            async with get_session() as session:
+                return consume(await session.execute(stmt))
+
+        # One scan yields the overall counts, per-project counts and doc type
+        # counts; the key columns are NOT NULL, so NULLs mark the grouping set
+        count = func.count(Conversation.id).label("count")
+        counts_stmt = (
+            select(
+                Conversation.project_name,
+                Conversation.doc_type,
+                count,
+                func.count(Conversation.id)
+                .filter(Conversation.embedding.isnot(None))
+                .label("embedded"),
             )
-            project_result = await session.execute(project_stmt)
-            projects = [
-                {"project": row.project_name, "count": row.count}
-                for row in project_result.all()
-            ]
-
-            # Get doc type counts
-            doctype_stmt = (
-                select(
-                    Conversation.doc_type,
-                    func.count(Conversation.id).label("count"),
+            .group_by(
+                func.grouping_sets(
+                    tuple_(Conversation.project_name),
+                    tuple_(Conversation.doc_type),
+                    tuple_(),
                 )
-                .group_by(Conversation.doc_type)
             )
-            doctype_result = await session.execute(doctype_stmt)
-            doc_types = {row.doc_type: row.count for row in doctype_result.all()}
-
-            # Get last index status
-            status_stmt = (
-                select(IndexStatus)
-                .where(IndexStatus.project_name.is_(None))
-                .order_by(IndexStatus.last_index_at.desc())
-                .limit(1)
-            )
-            status_result = await session.execute(status_stmt)
-            last_status = status_result.scalar_one_or_none()
-
-            return {
-                "total_conversations": total_count,
-                "with_embeddings": embedded_count,
-                "projects": projects,
-                "doc_types": doc_types,
-                "last_index": {
-                    "status": last_status.status if last_status else "never",
-                    "at": (
-                        last_status.last_index_at.isoformat()
-                        if last_status and last_status.last_index_at
-                        else None
-                    ),
-                    "files_indexed": last_status.files_indexed if last_status else 0,
-                    "files_updated": last_status.files_updated if last_status else 0,
-                    "files_failed": last_status.files_failed if last_status else 0,
-                    "error": last_status.error_message if last_status else None,
-                },
-            }
+            .order_by(count.desc())
+        )
+
+        # Get last index status
+        status_stmt = (
+            select(IndexStatus)
+            .where(IndexStatus.project_name.is_(None))
+            .order_by(IndexStatus.last_index_at.desc())
+            .limit(1)
+        )
+
+        # The queries are independent, so their round trips overlap
+        count_rows, last_status = await asyncio.gather(
+            query(counts_stmt, lambda r: r.all()),
+            query(status_stmt, lambda r: r.scalar_one_or_none()),
+        )
+
+        total_count = embedded_count = 0
+        projects = []
+        doc_types = {}
+        for row in count_rows:
+            if row.project_name is not None:
+                projects.append({"project": row.project_name, "count": row.count})
+            elif row.doc_type is not None:
+                doc_types[row.doc_type] = row.count
+            else:
+                total_count, embedded_count = row.count, row.embedded
+
+        return {
+            "total_conversations": total_count,
+            "with_embeddings": embedded_count,
+            "projects": projects,
+            "doc_types": doc_types,
+            "last_index": {
+                "status": last_status.status if last_status else "never",
+                "at": (
+                    last_status.last_index_at.isoformat()
+                    if last_status and last_status.last_index_at
+                    else None
+                ),
+                "files_indexed": last_status.files_indexed if last_status else 0,
+                "files_updated": last_status.files_updated if last_status else 0,
+                "files_failed": last_status.files_failed if last_status else 0,
+                "error": last_status.error_message if last_status else None,
+            },
+        }
 
     @mcp.tool()
     async def delete_project_index(project: str) -> dict:
@@ -137,35 +155,36 @@ def register_sync_tools(mcp: FastMCP, get_session):
         """
         from sqlalchemy import delete
 
+        # Delete conversations (chunks cascade delete) and count them in the
+        # same statement; only the count comes back, not every deleted id
+        deleted = (
+            delete(Conversation)
+            .where(Conversation.project_name == project)
+            .returning(Conversation.id)
+            .cte("deleted")
+        )
         async with get_session() as session:
-            # Count before delete
-            count_stmt = select(func.count(Conversation.id)).where(
-                Conversation.project_name == project
-            )
-            count_result = await session.execute(count_stmt)
-            count = count_result.scalar() or 0
-
-            if count == 0:
-                return {
-                    "success": True,
-                    "project": project,
-                    "deleted": 0,
-                    "message": "No conversations found for this project.",
-                }
-
-            # Delete conversations (chunks cascade delete)
-            delete_stmt = delete(Conversation).where(
-                Conversation.project_name == project
+            result = await session.execute(
+                select(func.count()).select_from(deleted)
             )
-            await session.execute(delete_stmt)
-            await session.commit()
+            count = result.scalar() or 0
+        # get_session has committed by now
+        invalidate_all()
 
+        if count == 0:
             return {
                 "success": True,
                 "project": project,
-                "deleted": count,
+                "deleted": 0,
+                "message": "No conversations found for this project.",
             }
 
+        return {
+            "success": True,
+            "project": project,
+            "deleted": count,
+        }
+
     @mcp.tool()
     async def import_agent_progress(
         workflow_id: str | None = None,
@@ -187,8 +206,10 @@ def register_sync_tools(mcp: FastMCP, get_session):
         Returns:
             Import statistics including workflows_found, workflows_imported, etc.
         """
-        from ...config import settings
-        from ...indexer import AgentProgressSource, ConversationIndexer
+        from ...config import get_settings
+        from ...indexer import AgentProgressSource, ConversationIndexer, aiter_files
+
+        settings = get_settings()
 
         # Check prerequisites
         if not settings.has_source_database:
@@ -208,40 +229,62 @@ def register_sync_tools(mcp: FastMCP, get_session):
         try:
             source = AgentProgressSource()
 
-            # Fetch workflows based on criteria
-            if workflow_id:
-                files = await source.scan_workflow(workflow_id)
-            else:
-                files = await source.scan_since(since_days)
-
             if dry_run:
-                # Return preview without indexing
-                return {
-                    "success": True,
-                    "dry_run": True,
-                    "workflows_found": len(files),
-                    "workflows": [
-                        {
+                # Fetch workflows based on criteria; the stream is counted
+                # but only the previewed files are kept
+                if workflow_id:
+                    files = aiter_files(await source.scan_workflow(workflow_id))
+                else:
+                    files = source.scan_since(since_days)
+
+                found = 0
+                preview = []
+                async for f in files:
+                    if found < 20:  # Limit preview
+                        preview.append({
                             "source_id": f.file_path,
                             "project": f.project_name,
                             "title": f.title,
                             "doc_type": f.doc_type,
                             "content_length": len(f.content),
-                        }
-                        for f in files[:20]  # Limit preview
-                    ],
-                    "message": f"Found {len(files)} workflows to import. Run without dry_run to import.",
+                        })
+                    found += 1
+
+                # Return preview without indexing
+                return {
+                    "success": True,
+                    "dry_run": True,
+                    "workflows_found": found,
+                    "workflows": preview,
+                    "message": f"Found {found} workflows to import. Run without dry_run to import.",
                 }
 
             # Index the files
             async with get_session() as session:
                 indexer = ConversationIndexer(session, source=source)
-                result = await indexer.index_files(files, force=force)
+                try:
+                    if workflow_id:
+                        result = await indexer.index_files(
+                            await source.scan_workflow(workflow_id), force=force
+                        )
+                    else:
+                        # Stream batches so fetching overlaps with embedding
+                        # and the whole window is never held in memory
+                        result = await indexer.index_stream(
+                            source.scan_since(since_days), force=force
+                        )
+                finally:
+                    invalidate_all()
 
                 return {
                     "success": result.files_failed == 0,
                     "dry_run": False,
-                    "workflows_found": len(files),
+                    "workflows_found": (
+                        result.files_indexed
+                        + result.files_updated
+                        + result.files_skipped
+                        + result.files_failed
+                    ),
                     "workflows_indexed": result.files_indexed,
                     "workflows_updated": result.files_updated,
                     "workflows_skipped": result.files_skipped,
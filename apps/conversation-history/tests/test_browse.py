@@ -0,0 +1,50 @@
+"""Tests for keyset paging cursors in the browse tools."""
+
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from conversation_history.mcp.tools.browse import (
+    _decode_cursor,
+    _encode_cursor,
+    _next_cursor,
+)
+
+INDEXED_AT = datetime(2026, 10, 16, 12, 0, 0, 123456, tzinfo=timezone.utc)
+
+
+def test_cursor_round_trip():
+    conversation_id = uuid.uuid4()
+    cursor = _encode_cursor(INDEXED_AT, conversation_id)
+    assert _decode_cursor(cursor) == (INDEXED_AT, conversation_id)
+
+
+def test_cursor_pages_across_indexed_at_tie():
+    # Three rows share indexed_at; listings order by (indexed_at, id) DESC
+    rows = sorted(
+        (SimpleNamespace(indexed_at=INDEXED_AT, id=uuid.uuid4()) for _ in range(3)),
+        key=lambda row: (row.indexed_at, row.id),
+        reverse=True,
+    )
+
+    cursor = _next_cursor(rows[0], returned=1, limit=1)
+    after = _decode_cursor(cursor)
+
+    # The query's row comparison (indexed_at, id) < cursor resumes inside
+    # the tie, skipping only the row already returned
+    remaining = [row for row in rows if (row.indexed_at, row.id) < after]
+    assert remaining == rows[1:]
+
+
+def test_no_cursor_after_last_page():
+    row = SimpleNamespace(indexed_at=INDEXED_AT, id=uuid.uuid4())
+    assert _next_cursor(row, returned=1, limit=2) is None
+    assert _next_cursor(None, returned=0, limit=2) is None
+    assert _next_cursor(row, returned=1, limit=None) is None
+
+
+def test_malformed_cursor_is_rejected():
+    with pytest.raises(ValueError):
+        _decode_cursor("not a cursor")
@@ -0,0 +1,182 @@
+"""Tests for document embedding reuse in the indexer."""
+
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+from conversation_history.indexer.indexer import (
+    EMBEDDING_INPUT_CHARS,
+    ConversationIndexer,
+    _embedding_hash,
+)
+from conversation_history.indexer.scanner import ConversationFile, hash_content
+
+PREFIX = "x" * EMBEDDING_INPUT_CHARS
+
+
+class FakeEmbedder:
+    """Records the texts it is asked to embed."""
+
+    def __init__(self):
+        self.calls: list[list[str]] = []
+
+    async def embed_batch(self, texts, batch_size=100):
+        self.calls.append(list(texts))
+        return [[float(len(text))] for text in texts]
+
+
+class FakeSession:
+    """Just enough of AsyncSession for _embed_conversations."""
+
+    @asynccontextmanager
+    async def begin_nested(self):
+        yield
+
+
+class FakeConnection:
+    """Returns canned RETURNING rows from the upsert."""
+
+    def __init__(self, returned):
+        self.returned = returned
+        self.params = None
+
+    async def execute(self, stmt, params):
+        self.params = params
+        return self.returned
+
+
+def make_file(content: str, path: str = "/p/conversation/a.md") -> ConversationFile:
+    return ConversationFile(
+        file_path=path,
+        project_name="p",
+        feature_name=None,
+        doc_type="other",
+        title="a",
+        content=content,
+        content_hash=hash_content(content),
+    )
+
+
+def make_indexer(embedder=None, session=None) -> ConversationIndexer:
+    return ConversationIndexer(
+        session or FakeSession(),
+        source=object(),
+        embedder=embedder or FakeEmbedder(),
+    )
+
+
+def capture_writes(indexer: ConversationIndexer) -> list:
+    writes = []
+
+    async def write_embeddings(batch):
+        writes.extend(batch)
+
+    indexer._write_embeddings = write_embeddings
+    return writes
+
+
+def test_embedding_hash_ignores_content_past_prefix():
+    assert _embedding_hash(PREFIX + "old tail") == _embedding_hash(PREFIX + "new tail")
+
+
+def test_embedding_hash_changes_with_prefix():
+    edited = "y" + PREFIX[1:]
+    assert _embedding_hash(PREFIX + "tail") != _embedding_hash(edited + "tail")
+
+
+async def test_upsert_rebuilds_chunks_but_keeps_embedding_for_tail_edit():
+    file = make_file(PREFIX + "new tail")
+    # The row kept its embedding (stale=False) but its content changed
+    returned = [
+        SimpleNamespace(
+            id=1, file_path=file.file_path, inserted=False, stale=False, changed=True
+        )
+    ]
+    conn = FakeConnection(returned)
+
+    async def connection():
+        return conn
+
+    session = FakeSession()
+    session.connection = connection
+    indexer = make_indexer(session=session)
+
+    changed = await indexer._upsert_batch([file])
+
+    # Chunks are rebuilt while the document embedding stays
+    assert [(row.id, row.stale) for row, _ in changed] == [(1, False)]
+    # The upsert's CASE keeps the embedding because this matches the stored hash
+    assert conn.params[0]["embedding_hash"] == _embedding_hash(PREFIX + "old tail")
+
+
+async def test_upsert_skips_unchanged_rows():
+    file = make_file("same")
+    returned = [
+        SimpleNamespace(
+            id=1, file_path=file.file_path, inserted=False, stale=False, changed=False
+        )
+    ]
+    conn = FakeConnection(returned)
+
+    async def connection():
+        return conn
+
+    session = FakeSession()
+    session.connection = connection
+
+    assert await make_indexer(session=session)._upsert_batch([file]) == []
+
+
+async def test_kept_embedding_is_not_requested_again():
+    embedder = FakeEmbedder()
+    indexer = make_indexer(embedder)
+    writes = capture_writes(indexer)
+
+    errors = await indexer._embed_conversations(
+        [(1, make_file("short content"), False)], reuse=False
+    )
+
+    assert errors == [None]
+    assert embedder.calls == []
+    # No document embedding write, and a single-chunk file has no chunks
+    assert writes == [(1, None, [])]
+
+
+async def test_changed_prefix_is_reembedded():
+    embedder = FakeEmbedder()
+    indexer = make_indexer(embedder)
+    writes = capture_writes(indexer)
+    content = "z" + PREFIX[1:] + "tail"
+
+    errors = await indexer._embed_conversations(
+        [(1, make_file(content), True)], reuse=False
+    )
+
+    assert errors == [None]
+    # One request: the document prefix first, then its chunks
+    assert len(embedder.calls) == 1
+    assert embedder.calls[0][0] == content[:EMBEDDING_INPUT_CHARS]
+    conv_id, doc, _ = writes[0]
+    assert conv_id == 1
+    assert doc[0] == _embedding_hash(content)
+
+
+async def test_failed_chunk_rebuild_is_marked_for_retry():
+    class FailingEmbedder(FakeEmbedder):
+        async def embed_batch(self, texts, batch_size=100):
+            raise RuntimeError("rate limited")
+
+    indexer = make_indexer(FailingEmbedder())
+    marked = []
+
+    async def mark_pending(failed):
+        marked.extend(conv_id for conv_id, _, _ in failed)
+
+    indexer._mark_pending = mark_pending
+    content = PREFIX + "tail"
+
+    errors = await indexer._embed_conversations(
+        [(1, make_file(content), False)], reuse=False
+    )
+
+    assert isinstance(errors[0], RuntimeError)
+    assert marked == [1]
@@ -0,0 +1,52 @@
+"""Index foreign keys on splits, tags and recurring transactions
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-16 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "004"
+down_revision: Union[str, None] = "003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Postgres does not index foreign keys itself; without these, joins and
+    # ON DELETE CASCADE / SET NULL from the parent scan the whole child table
+    op.create_index(
+        "ix_transaction_splits_transaction_id", "transaction_splits", ["transaction_id"]
+    )
+    op.create_index(
+        "ix_transaction_splits_category_id", "transaction_splits", ["category_id"]
+    )
+    # The primary key leads with transaction_id, so only tag_id needs one.
+    # With transaction_id in the key, tag -> transactions lookups are
+    # answered from the index alone, like the primary key's direction
+    op.create_index(
+        "ix_transaction_tags_tag_transaction",
+        "transaction_tags",
+        ["tag_id", "transaction_id"],
+    )
+    op.create_index(
+        "ix_recurring_transactions_account_id", "recurring_transactions", ["account_id"]
+    )
+    op.create_index(
+        "ix_recurring_transactions_category_id",
+        "recurring_transactions",
+        ["category_id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_recurring_transactions_category_id", "recurring_transactions")
+    op.drop_index("ix_recurring_transactions_account_id", "recurring_transactions")
+    op.drop_index("ix_transaction_tags_tag_transaction", "transaction_tags")
+    op.drop_index("ix_transaction_splits_category_id", "transaction_splits")
+    op.drop_index("ix_transaction_splits_transaction_id", "transaction_splits")
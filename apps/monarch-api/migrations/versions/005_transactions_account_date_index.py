@@ -0,0 +1,40 @@
+"""Index transactions by account, newest first
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-16 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "005"
+down_revision: Union[str, None] = "004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # "Recent transactions for an account" filters on account_id and sorts
+    # by date, so both come straight from the index with no sort step. It
+    # also serves plain account_id lookups, replacing the single-column
+    # index; (date, account_id) added nothing over ix_transactions_date
+    op.create_index(
+        "ix_transactions_account_date",
+        "transactions",
+        ["account_id", sa.text("date DESC")],
+    )
+    op.drop_index("ix_transactions_date_account", "transactions")
+    op.drop_index("ix_transactions_account_id", "transactions")
+
+
+def downgrade() -> None:
+    op.create_index("ix_transactions_account_id", "transactions", ["account_id"])
+    op.create_index(
+        "ix_transactions_date_account", "transactions", ["date", "account_id"]
+    )
+    op.drop_index("ix_transactions_account_date", "transactions")
@@ -0,0 +1,39 @@
+"""Index only active API tokens by hash
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-16 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "006"
+down_revision: Union[str, None] = "005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Auth looks tokens up by hash among active ones only, so revoked
+    # tokens are left out of the index. Expiry cannot be part of the
+    # predicate (now() is not immutable) and is still checked per row
+    op.create_index(
+        "ix_api_tokens_token_hash_active",
+        "api_tokens",
+        ["token_hash"],
+        unique=True,
+        postgresql_where=sa.text("is_active"),
+    )
+    op.drop_index("ix_api_tokens_token_hash", "api_tokens")
+
+
+def downgrade() -> None:
+    op.create_index(
+        "ix_api_tokens_token_hash", "api_tokens", ["token_hash"], unique=True
+    )
+    op.drop_index("ix_api_tokens_token_hash_active", "api_tokens")
@@ -0,0 +1,36 @@
+"""Store api_tokens.scope as a Postgres enum
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-16 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "007"
+down_revision: Union[str, None] = "006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # An unknown scope would silently rank as "read" in require_scope, so
+    # the type rejects them. Enum values sort in declaration order, so
+    # scope >= 'write' also works in SQL
+    op.execute("CREATE TYPE api_scope AS ENUM ('read', 'write', 'admin')")
+    op.execute(
+        "ALTER TABLE api_tokens ALTER COLUMN scope TYPE api_scope "
+        "USING scope::api_scope"
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        "ALTER TABLE api_tokens ALTER COLUMN scope TYPE varchar(20) "
+        "USING scope::text"
+    )
+    op.execute("DROP TYPE api_scope")
@@ -0,0 +1,35 @@
+"""Slim transaction_tags down to the link columns
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-16 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "008"
+down_revision: Union[str, None] = "007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Tag links are deleted and re-inserted on every sync, so created_at
+    # only ever recorded the last sync and nothing reads it
+    op.drop_column("transaction_tags", "created_at")
+
+
+def downgrade() -> None:
+    op.add_column(
+        "transaction_tags",
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+        ),
+    )
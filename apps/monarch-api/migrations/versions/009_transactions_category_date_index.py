@@ -0,0 +1,34 @@
+"""Index transactions by category, newest first
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-16 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "009"
+down_revision: Union[str, None] = "008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Same shape as ix_transactions_account_date: filter by category, read
+    # newest first without a sort. It also serves category_id lookups.
+    op.create_index(
+        "ix_transactions_category_date",
+        "transactions",
+        ["category_id", sa.text("date DESC")],
+    )
+    op.drop_index("ix_transactions_category_id", "transactions")
+
+
+def downgrade() -> None:
+    op.create_index("ix_transactions_category_id", "transactions", ["category_id"])
+    op.drop_index("ix_transactions_category_date", "transactions")
@@ -0,0 +1,35 @@
+"""Trigram index for merchant name search
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-16 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "010"
+down_revision: Union[str, None] = "009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # Merchant search is ILIKE '%term%', which a B-tree cannot serve
+    op.create_index(
+        "ix_transactions_merchant_name_trgm",
+        "transactions",
+        ["merchant_name"],
+        postgresql_using="gin",
+        postgresql_ops={"merchant_name": "gin_trgm_ops"},
+    )
+    op.drop_index("ix_transactions_merchant_name", "transactions")
+
+
+def downgrade() -> None:
+    op.create_index("ix_transactions_merchant_name", "transactions", ["merchant_name"])
+    op.drop_index("ix_transactions_merchant_name_trgm", "transactions")
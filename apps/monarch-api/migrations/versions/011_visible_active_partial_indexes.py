@@ -0,0 +1,50 @@
+"""Partial indexes for visible / active rows
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-16 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "011"
+down_revision: Union[str, None] = "010"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Listings filter on the common side of a skewed boolean; indexing only
+    # those rows keeps the index small, and the predicate is written the
+    # way the queries are (is_hidden == False) so the planner can match it
+    op.create_index(
+        "ix_accounts_visible",
+        "accounts",
+        ["id"],
+        postgresql_where=sa.text("is_hidden = false"),
+    )
+    op.drop_index("ix_accounts_is_hidden", "accounts")
+    op.create_index(
+        "ix_categories_visible",
+        "categories",
+        ["group_id"],
+        postgresql_where=sa.text("is_hidden = false"),
+    )
+    op.create_index(
+        "ix_recurring_transactions_active",
+        "recurring_transactions",
+        ["account_id"],
+        postgresql_where=sa.text("is_active = true"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_recurring_transactions_active", "recurring_transactions")
+    op.drop_index("ix_categories_visible", "categories")
+    op.create_index("ix_accounts_is_hidden", "accounts", ["is_hidden"])
+    op.drop_index("ix_accounts_visible", "accounts")
@@ -0,0 +1,34 @@
+"""Cover the date-range aggregates from the date index
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-16 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "012"
+down_revision: Union[str, None] = "011"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Monthly income/expense sums, cashflow and spending trends read only
+    # these columns over a date range, so they become index-only scans
+    op.drop_index("ix_transactions_date", "transactions")
+    op.create_index(
+        "ix_transactions_date",
+        "transactions",
+        ["date"],
+        postgresql_include=["amount", "hide_from_reports", "category_id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_transactions_date", "transactions")
+    op.create_index("ix_transactions_date", "transactions", ["date"])
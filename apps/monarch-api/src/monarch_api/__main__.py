@@ -14,15 +14,30 @@ def main() -> None:
     parser.add_argument("--port", type=int, default=settings.port, help="Port to bind to")
     parser.add_argument("--reload", action="store_true", help="Enable auto-reload")
     parser.add_argument("--debug", action="store_true", help="Enable debug mode")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes (each runs its own sync scheduler)",
+    )
+    parser.add_argument(
+        "--access-log", action="store_true", help="Log every request (on with --debug)"
+    )
 
     args = parser.parse_args()
 
+    # uvicorn[standard] installs uvloop and httptools, which the default
+    # "auto" loop/http settings pick up. --debug only raises the log level;
+    # the reloader (a separate supervising process) needs --reload
     uvicorn.run(
         "monarch_api.main:app",
         host=args.host,
         port=args.port,
-        reload=args.reload or args.debug,
+        reload=args.reload,
+        workers=None if args.reload else args.workers,
         log_level="debug" if args.debug else "info",
+        # Per-request log lines are a large share of CPU for small responses
+        access_log=args.access_log or args.debug,
     )
 
 
@@ -1,9 +1,10 @@
 """Authentication package for HTTP API."""
 
-from .dependencies import get_current_token, require_api_token, require_scope
+from .dependencies import get_current_token, hash_token, require_api_token, require_scope
 
 __all__ = [
     "get_current_token",
+    "hash_token",
     "require_api_token",
     "require_scope",
 ]
@@ -1,19 +1,69 @@
 """FastAPI dependencies for API token authentication."""
 
 import hashlib
+import time
+from functools import lru_cache
 from typing import Annotated
 
 from fastapi import Depends, HTTPException, Security
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ..config import settings
 from ..db.engine import get_db
 from ..db.models import APIToken
 from ..db.repositories import APITokenRepository
+from .last_used_batcher import last_used_batcher
 
 # Bearer token security scheme
 security = HTTPBearer(auto_error=False)
 
+# Scope levels; a token satisfies any scope at or below its own
+_SCOPE_HIERARCHY = {"read": 0, "write": 1, "admin": 2}
+
+# Validated tokens by hash, with the monotonic time they stop being trusted
+_TOKEN_CACHE_SIZE = 1024
+_token_cache: dict[str, tuple[float, APIToken]] = {}
+
+
+def hash_token(raw_token: str) -> str:
+    """Hash a raw API token for storage and lookup.
+
+    Only the SHA-256 hex digest is stored, so raw tokens never reach the
+    database. Changing the scheme would invalidate every issued token.
+    """
+    return hashlib.sha256(raw_token.encode()).hexdigest()
+
+
+def _cached_token(token_hash: str) -> APIToken | None:
+    """Return a still-fresh cached token, if any."""
+    entry = _token_cache.get(token_hash)
+    if entry is None:
+        return None
+    if entry[0] <= time.monotonic():
+        _token_cache.pop(token_hash, None)
+        return None
+    return entry[1]
+
+
+def _cache_token(token_hash: str, token: APIToken) -> None:
+    """Remember a validated token for auth_cache_ttl_seconds."""
+    # Expiring tokens are always re-checked against the database
+    if settings.auth_cache_ttl_seconds <= 0 or token.expires_at is not None:
+        return
+    if len(_token_cache) >= _TOKEN_CACHE_SIZE:
+        # Drop the oldest entry (dicts keep insertion order)
+        _token_cache.pop(next(iter(_token_cache)))
+    _token_cache[token_hash] = (time.monotonic() + settings.auth_cache_ttl_seconds, token)
+
+
+def invalidate_token(token_hash: str) -> None:
+    """Stop trusting a cached token, e.g. after it is revoked.
+
+    Only affects this process; other workers drop it when the TTL expires.
+    """
+    _token_cache.pop(token_hash, None)
+
 
 async def get_current_token(
     credentials: Annotated[HTTPAuthorizationCredentials | None, Security(security)],
@@ -27,19 +77,22 @@ async def get_current_token(
     if credentials is None:
         return None
 
-    token_hash = hashlib.sha256(credentials.credentials.encode()).hexdigest()
+    token_hash = hash_token(credentials.credentials)
     repo = APITokenRepository(session)
-    token = await repo.get_by_hash(token_hash)
-
+    token = _cached_token(token_hash)
     if token is None:
-        raise HTTPException(
-            status_code=401,
-            detail="Invalid or expired API token",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        token = await repo.get_by_hash(token_hash)
+
+        if token is None:
+            raise HTTPException(
+                status_code=401,
+                detail="Invalid or expired API token",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        _cache_token(token_hash, token)
 
-    # Update last used timestamp (fire and forget)
-    await repo.update_last_used(token.id)
+    # Written in the background, batched with other requests
+    last_used_batcher.touch(token.id)
 
     return token
 
@@ -60,26 +113,28 @@ async def require_api_token(
     return token
 
 
+@lru_cache
 def require_scope(required_scope: str):
     """Create a dependency that requires a specific scope.
 
     Scope hierarchy: admin > write > read
 
+    Cached per scope, so every route requiring the same scope shares one
+    dependency and FastAPI resolves it once per request.
+
     Args:
         required_scope: The minimum scope required ("read", "write", or "admin")
 
     Returns:
         A FastAPI dependency function
     """
-    scope_hierarchy = {"read": 0, "write": 1, "admin": 2}
+    required_level = _SCOPE_HIERARCHY.get(required_scope, 0)
 
+    # Kept async: FastAPI runs plain def dependencies in a threadpool
     async def check_scope(
         token: Annotated[APIToken, Depends(require_api_token)],
     ) -> APIToken:
-        token_level = scope_hierarchy.get(token.scope, 0)
-        required_level = scope_hierarchy.get(required_scope, 0)
-
-        if token_level < required_level:
+        if _SCOPE_HIERARCHY.get(token.scope, 0) < required_level:
             raise HTTPException(
                 status_code=403,
                 detail=f"Insufficient permissions. Required scope: {required_scope}, your scope: {token.scope}",
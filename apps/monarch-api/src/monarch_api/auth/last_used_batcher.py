@@ -0,0 +1,87 @@
+"""Background batching of API token last_used_at updates."""
+
+import asyncio
+import logging
+from datetime import datetime
+
+from ..config import settings
+from ..db.engine import AsyncSessionLocal
+from ..db.repositories import APITokenRepository
+
+logger = logging.getLogger(__name__)
+
+# Tokens per UPDATE statement
+FLUSH_BATCH_SIZE = 500
+
+
+class LastUsedBatcher:
+    """Coalesces token usage into periodic last_used_at writes.
+
+    Requests only record the token id; a background task writes the
+    latest timestamp per token every auth_last_used_flush_seconds, so a
+    busy token costs one UPDATE per interval instead of one per request.
+    """
+
+    def __init__(self):
+        self._task: asyncio.Task | None = None
+        self._running = False
+        self._pending: dict[int, datetime] = {}
+
+    @property
+    def is_running(self) -> bool:
+        """Check if the batcher is running."""
+        return self._running
+
+    def touch(self, token_id: int) -> None:
+        """Record that a token was just used."""
+        if self._running:
+            # Later uses overwrite earlier ones, keeping the newest timestamp
+            self._pending[token_id] = datetime.now()
+
+    async def start(self) -> None:
+        """Start the background flush loop."""
+        if self._running:
+            logger.warning("Last-used batcher already running")
+            return
+
+        self._running = True
+        self._task = asyncio.create_task(self._run_loop())
+
+    async def stop(self) -> None:
+        """Stop the flush loop and write anything still pending."""
+        self._running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def flush(self) -> None:
+        """Write all pending last_used_at timestamps."""
+        if not self._pending:
+            # Idle intervals don't need a connection
+            return
+        pending, self._pending = self._pending, {}
+        items = list(pending.items())
+        async with AsyncSessionLocal() as session:
+            repo = APITokenRepository(session)
+            for i in range(0, len(items), FLUSH_BATCH_SIZE):
+                await repo.update_last_used_many(dict(items[i : i + FLUSH_BATCH_SIZE]))
+            await session.commit()
+
+    async def _run_loop(self) -> None:
+        """Flush pending timestamps on a fixed interval."""
+        while self._running:
+            await asyncio.sleep(settings.auth_last_used_flush_seconds)
+            try:
+                await self.flush()
+            except Exception:
+                # Usage timestamps are best effort; drop this batch
+                logger.exception("Failed to write token last_used_at")
+
+
+# Global batcher instance
+last_used_batcher = LastUsedBatcher()
@@ -1,31 +1,34 @@
 """CLI tools for Monarch API administration."""
 
 import asyncio
-import hashlib
 import secrets
 import sys
 from datetime import datetime, timedelta
+from typing import TYPE_CHECKING
 
-from sqlalchemy import select
-
-from .config import settings
-from .db.engine import AsyncSessionLocal
-from .db.models import APIToken
-from .db.repositories import APITokenRepository
+# Settings, SQLAlchemy and the models are imported where they are used,
+# so --help and argument errors don't pay for loading them
+if TYPE_CHECKING:
+    from .db.models import APIToken
 
 
 async def _create_token(
     name: str,
     scope: str = "admin",
     expires_in_days: int | None = None,
-) -> tuple[str, APIToken]:
+) -> tuple[str, "APIToken"]:
     """Create an API token in the database."""
+    from .auth.dependencies import hash_token
+    from .config import settings
+    from .db.engine import AsyncSessionLocal
+    from .db.repositories import APITokenRepository
+
     if not settings.has_database:
         raise RuntimeError("DATABASE_URL not configured")
 
     # Generate token
     raw_token = secrets.token_urlsafe(32)
-    token_hash = hashlib.sha256(raw_token.encode()).hexdigest()
+    token_hash = hash_token(raw_token)
 
     # Calculate expiration
     expires_at = None
@@ -47,8 +50,14 @@ async def _create_token(
     return raw_token, token
 
 
-async def _list_tokens() -> list[APIToken]:
+async def _list_tokens() -> list["APIToken"]:
     """List all API tokens."""
+    from sqlalchemy import select
+
+    from .config import settings
+    from .db.engine import AsyncSessionLocal
+    from .db.models import APIToken
+
     if not settings.has_database:
         raise RuntimeError("DATABASE_URL not configured")
 
@@ -61,6 +70,10 @@ async def _list_tokens() -> list[APIToken]:
 
 async def _revoke_token(token_id: int) -> bool:
     """Revoke an API token by ID."""
+    from .config import settings
+    from .db.engine import AsyncSessionLocal
+    from .db.repositories import APITokenRepository
+
     if not settings.has_database:
         raise RuntimeError("DATABASE_URL not configured")
 
@@ -135,10 +148,17 @@ def revoke_token(token_id: int) -> None:
     Args:
         token_id: The ID of the token to revoke
     """
+    from .config import settings
+
     try:
         success = asyncio.run(_revoke_token(token_id))
         if success:
             print(f"Token {token_id} revoked successfully.")
+            # Running servers trust a validated token for a short while
+            print(
+                f"Running servers stop accepting it within "
+                f"{settings.auth_cache_ttl_seconds} seconds."
+            )
         else:
             print(f"Token {token_id} not found.", file=sys.stderr)
             sys.exit(1)
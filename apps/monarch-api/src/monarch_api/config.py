@@ -1,5 +1,7 @@
 """Application configuration via pydantic-settings."""
 
+from functools import cached_property
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -11,6 +13,7 @@ class Settings(BaseSettings):
         env_file_encoding="utf-8",
         case_sensitive=False,
         extra="ignore",  # Ignore unknown env vars from other projects
+        frozen=True,  # Read once at startup; derived values below are cached
     )
 
     # Authentication - either token or email/password
@@ -25,6 +28,8 @@ class Settings(BaseSettings):
 
     # API settings
     api_prefix: str = ""
+    auth_cache_ttl_seconds: int = 60  # How long a validated API token is trusted
+    auth_last_used_flush_seconds: int = 5  # Interval between last_used_at writes
 
     # Database settings
     database_url: str | None = None  # Full URL takes precedence
@@ -33,6 +38,11 @@ class Settings(BaseSettings):
     database_name: str = "monarch"
     database_user: str = "monarch"
     database_password: str = ""
+    db_pool_size: int = 20
+    db_max_overflow: int = 10
+    db_pool_recycle: int = 1800  # seconds; replaces a ping on every checkout
+    db_pool_pre_ping: bool = False
+    db_pgbouncer: bool = False  # Behind PgBouncer in transaction pooling mode
 
     # Sync settings
     sync_enabled: bool = True
@@ -48,7 +58,7 @@ class Settings(BaseSettings):
         """Check if email/password authentication is configured."""
         return self.monarch_email is not None and self.monarch_password is not None
 
-    @property
+    @cached_property
     def async_database_url(self) -> str:
         """Get async database URL for SQLAlchemy."""
         if self.database_url:
@@ -64,7 +74,7 @@ class Settings(BaseSettings):
             f"@{self.database_host}:{self.database_port}/{self.database_name}"
         )
 
-    @property
+    @cached_property
     def sync_database_url(self) -> str:
         """Get sync database URL for Alembic."""
         if self.database_url:
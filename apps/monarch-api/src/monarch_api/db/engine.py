@@ -1,18 +1,44 @@
 """Database engine and session management."""
 
+import uuid
 from collections.abc import AsyncGenerator
+from typing import Any
 
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
 
 from ..config import settings
 
+
+def _unique_statement_name() -> str:
+    """Name prepared statements uniquely, as PgBouncer requires."""
+    return f"__asyncpg_{uuid.uuid4()}__"
+
+
+if settings.db_pgbouncer:
+    # PgBouncer (transaction pooling) owns the pool; server-side prepared
+    # statements would collide across its backends
+    _pool_args: dict[str, Any] = {"poolclass": NullPool}
+    _connect_args: dict[str, Any] = {
+        "statement_cache_size": 0,
+        "prepared_statement_cache_size": 0,
+        "prepared_statement_name_func": _unique_statement_name,
+    }
+else:
+    _pool_args = {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+    _connect_args = {}
+
 # Create async engine with connection pooling
 engine = create_async_engine(
     settings.async_database_url,
     echo=settings.debug,
-    pool_size=5,
-    max_overflow=10,
-    pool_pre_ping=True,
+    connect_args=_connect_args,
+    **_pool_args,
 )
 
 # Session factory
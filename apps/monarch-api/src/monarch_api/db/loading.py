@@ -0,0 +1,14 @@
+"""Loader options shared by transaction read paths."""
+
+from sqlalchemy.orm import raiseload
+from sqlalchemy.orm.interfaces import LoaderOption
+
+
+def transaction_list_options(*eager: LoaderOption) -> list[LoaderOption]:
+    """Loader options for queries returning Transaction rows.
+
+    Relationships that callers need must be loaded explicitly (pass
+    e.g. ``selectinload(Transaction.splits)`` as ``eager``); every other
+    relationship raises on access instead of issuing one query per row.
+    """
+    return [*eager, raiseload("*")]
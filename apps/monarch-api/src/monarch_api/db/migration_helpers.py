@@ -0,0 +1,35 @@
+"""Helpers for Alembic migrations that must not block live traffic.
+
+Imported from migration scripts (alembic.ini puts src/ on sys.path).
+"""
+
+from alembic import op
+
+
+def add_foreign_key_online(
+    name: str,
+    source_table: str,
+    referent_table: str,
+    local_cols: list[str],
+    remote_cols: list[str],
+    ondelete: str | None = None,
+) -> None:
+    """Add a foreign key without holding an exclusive lock while it validates.
+
+    A plain ADD CONSTRAINT checks every existing row under an ACCESS
+    EXCLUSIVE lock on the table. Instead the constraint is added NOT VALID
+    (enforced for new writes only, committed at once), then validated in
+    its own transaction, which only needs SHARE UPDATE EXCLUSIVE and so
+    lets reads and writes continue.
+    """
+    op.create_foreign_key(
+        name,
+        source_table,
+        referent_table,
+        local_cols,
+        remote_cols,
+        ondelete=ondelete,
+        postgresql_not_valid=True,
+    )
+    with op.get_context().autocommit_block():
+        op.execute(f"ALTER TABLE {source_table} VALIDATE CONSTRAINT {name}")
@@ -6,6 +6,7 @@ from decimal import Decimal
 from sqlalchemy import (
     Boolean,
     DateTime,
+    Enum,
     ForeignKey,
     Index,
     Integer,
@@ -13,6 +14,7 @@ from sqlalchemy import (
     String,
     Text,
     func,
+    text,
 )
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
@@ -66,7 +68,15 @@ class Category(Base):
     group: Mapped[CategoryGroup | None] = relationship(back_populates="categories")
     transactions: Mapped[list["Transaction"]] = relationship(back_populates="category")
 
-    __table_args__ = (Index("ix_categories_group_id", "group_id"),)
+    __table_args__ = (
+        Index("ix_categories_group_id", "group_id"),
+        # Listings only show visible categories
+        Index(
+            "ix_categories_visible",
+            "group_id",
+            postgresql_where=text("is_hidden = false"),
+        ),
+    )
 
 
 class Tag(Base):
@@ -111,7 +121,9 @@ class Account(Base):
     data_provider: Mapped[str | None] = mapped_column(String(100))
     data_provider_id: Mapped[str | None] = mapped_column(String(100))
     institution_name: Mapped[str | None] = mapped_column(String(200))
-    institution_logo: Mapped[str | None] = mapped_column(Text)
+    institution_logo: Mapped[str | None] = mapped_column(
+        Text, deferred=True, deferred_raiseload=True
+    )  # Can be a large inline image; load with undefer() when needed
     created_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
     updated_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
     synced_at: Mapped[datetime] = mapped_column(
@@ -126,7 +138,8 @@ class Account(Base):
 
     __table_args__ = (
         Index("ix_accounts_account_type", "account_type"),
-        Index("ix_accounts_is_hidden", "is_hidden"),
+        # Listings only show visible accounts
+        Index("ix_accounts_visible", "id", postgresql_where=text("is_hidden = false")),
     )
 
 
@@ -139,7 +152,9 @@ class Transaction(Base):
     date: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
     amount: Mapped[Decimal] = mapped_column(Numeric(19, 4), nullable=False)
     merchant_name: Mapped[str | None] = mapped_column(String(200))
-    notes: Mapped[str | None] = mapped_column(Text)
+    notes: Mapped[str | None] = mapped_column(
+        Text, deferred=True, deferred_raiseload=True
+    )  # Free text, only shown in detail views; load with undefer()
     pending: Mapped[bool] = mapped_column(Boolean, default=False)
     is_recurring: Mapped[bool] = mapped_column(Boolean, default=False)
     has_attachments: Mapped[bool] = mapped_column(Boolean, default=False)
@@ -173,11 +188,24 @@ class Transaction(Base):
     )
 
     __table_args__ = (
-        Index("ix_transactions_date", "date"),
-        Index("ix_transactions_account_id", "account_id"),
-        Index("ix_transactions_category_id", "category_id"),
-        Index("ix_transactions_merchant_name", "merchant_name"),
-        Index("ix_transactions_date_account", "date", "account_id"),
+        # Account-agnostic date ranges (reports, cashflow); the included
+        # columns let the analytics aggregates skip the heap
+        Index(
+            "ix_transactions_date",
+            "date",
+            postgresql_include=["amount", "hide_from_reports", "category_id"],
+        ),
+        # Per-account / per-category listings, newest first; each also
+        # covers plain lookups on its leading column
+        Index("ix_transactions_account_date", "account_id", text("date DESC")),
+        Index("ix_transactions_category_date", "category_id", text("date DESC")),
+        # Merchant search is ILIKE '%term%' (needs the pg_trgm extension)
+        Index(
+            "ix_transactions_merchant_name_trgm",
+            "merchant_name",
+            postgresql_using="gin",
+            postgresql_ops={"merchant_name": "gin_trgm_ops"},
+        ),
     )
 
 
@@ -195,7 +223,9 @@ class TransactionSplit(Base):
         String(50), ForeignKey("categories.id", ondelete="SET NULL")
     )
     merchant_name: Mapped[str | None] = mapped_column(String(200))
-    notes: Mapped[str | None] = mapped_column(Text)
+    notes: Mapped[str | None] = mapped_column(
+        Text, deferred=True, deferred_raiseload=True
+    )
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
     )
@@ -203,6 +233,11 @@ class TransactionSplit(Base):
     # Relationships
     transaction: Mapped[Transaction] = relationship(back_populates="splits")
 
+    __table_args__ = (
+        Index("ix_transaction_splits_transaction_id", "transaction_id"),
+        Index("ix_transaction_splits_category_id", "category_id"),
+    )
+
 
 class TransactionTag(Base):
     """Many-to-many relationship between transactions and tags."""
@@ -215,14 +250,16 @@ class TransactionTag(Base):
     tag_id: Mapped[str] = mapped_column(
         String(50), ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True
     )
-    created_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), server_default=func.now()
-    )
 
     # Relationships
     transaction: Mapped[Transaction] = relationship(back_populates="transaction_tags")
     tag: Mapped[Tag] = relationship(back_populates="transaction_tags")
 
+    # The primary key covers lookups by transaction_id; this is its mirror
+    __table_args__ = (
+        Index("ix_transaction_tags_tag_transaction", "tag_id", "transaction_id"),
+    )
+
 
 class RecurringTransaction(Base):
     """Recurring transaction model."""
@@ -259,6 +296,16 @@ class RecurringTransaction(Base):
     # Relationships
     account: Mapped[Account | None] = relationship(back_populates="recurring_transactions")
 
+    __table_args__ = (
+        Index("ix_recurring_transactions_account_id", "account_id"),
+        Index("ix_recurring_transactions_category_id", "category_id"),
+        Index(
+            "ix_recurring_transactions_active",
+            "account_id",
+            postgresql_where=text("is_active = true"),
+        ),
+    )
+
 
 class SyncStatus(Base):
     """Track sync status for each entity type."""
@@ -301,12 +348,24 @@ class APIToken(Base):
     __tablename__ = "api_tokens"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    token_hash: Mapped[str] = mapped_column(String(64), unique=True, index=True, nullable=False)
+    token_hash: Mapped[str] = mapped_column(String(64), nullable=False)
     name: Mapped[str] = mapped_column(String(255), nullable=False)
-    scope: Mapped[str] = mapped_column(String(20), default="read")  # read, write, admin
+    scope: Mapped[str] = mapped_column(
+        Enum("read", "write", "admin", name="api_scope"), default="read"
+    )  # Ordered lowest to highest
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
     )
     expires_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     last_used_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    # Auth only ever looks up active tokens, so revoked ones stay out of the index
+    __table_args__ = (
+        Index(
+            "ix_api_tokens_token_hash_active",
+            "token_hash",
+            unique=True,
+            postgresql_where=text("is_active"),
+        ),
+    )
@@ -5,10 +5,12 @@ from datetime import datetime
 from decimal import Decimal
 from typing import TypeVar
 
-from sqlalchemy import delete, select, update
+from sqlalchemy import DateTime, Integer, column, delete, select, update, values
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import undefer
 
+from .loading import transaction_list_options
 from .models import (
     Account,
     APIToken,
@@ -26,6 +28,10 @@ from .models import (
 
 T = TypeVar("T", bound=Base)
 
+# asyncpg caps a statement at 32767 bind parameters; multi-row VALUES
+# batches are sized to stay below it with room to spare
+MAX_BIND_PARAMS = 30000
+
 
 class BaseRepository:
     """Base repository with common operations."""
@@ -179,7 +185,8 @@ class AccountRepository(BaseRepository):
 class TransactionRepository(BaseRepository):
     """Repository for transactions."""
 
-    BATCH_SIZE = 100  # Insert in batches to avoid giant queries
+    # One bind parameter per column per row (16 columns per transaction)
+    BATCH_SIZE = MAX_BIND_PARAMS // 16
 
     async def upsert_many(self, transactions: list[dict]) -> int:
         """Upsert multiple transactions in batches."""
@@ -227,7 +234,11 @@ class TransactionRepository(BaseRepository):
         max_amount: Decimal | None = None,
     ) -> Sequence[Transaction]:
         """Get transactions with filters."""
-        query = select(Transaction).order_by(Transaction.date.desc())
+        query = (
+            select(Transaction)
+            .options(*transaction_list_options())
+            .order_by(Transaction.date.desc())
+        )
 
         if start_date:
             query = query.where(Transaction.date >= start_date)
@@ -251,7 +262,9 @@ class TransactionRepository(BaseRepository):
     async def get_by_id(self, transaction_id: str) -> Transaction | None:
         """Get transaction by ID."""
         result = await self.session.execute(
-            select(Transaction).where(Transaction.id == transaction_id)
+            select(Transaction)
+            .options(*transaction_list_options(undefer(Transaction.notes)))
+            .where(Transaction.id == transaction_id)
         )
         return result.scalar_one_or_none()
 
@@ -261,6 +274,7 @@ class TransactionRepository(BaseRepository):
         """Get transactions in date range."""
         result = await self.session.execute(
             select(Transaction)
+            .options(*transaction_list_options())
             .where(Transaction.date >= start_date)
             .where(Transaction.date <= end_date)
             .order_by(Transaction.date.desc())
@@ -294,11 +308,15 @@ class TransactionTagRepository(BaseRepository):
             return
 
         # Delete all existing tags for these transactions
-        await self.session.execute(
-            delete(TransactionTag).where(
-                TransactionTag.transaction_id.in_(tag_mappings.keys())
+        transaction_ids = list(tag_mappings)
+        for i in range(0, len(transaction_ids), MAX_BIND_PARAMS):
+            await self.session.execute(
+                delete(TransactionTag).where(
+                    TransactionTag.transaction_id.in_(
+                        transaction_ids[i : i + MAX_BIND_PARAMS]
+                    )
+                )
             )
-        )
 
         # Build values for insert
         values = []
@@ -306,8 +324,11 @@ class TransactionTagRepository(BaseRepository):
             for tag_id in tag_ids:
                 values.append({"transaction_id": transaction_id, "tag_id": tag_id})
 
-        if values:
-            await self.session.execute(insert(TransactionTag).values(values))
+        batch_size = MAX_BIND_PARAMS // 2
+        for i in range(0, len(values), batch_size):
+            await self.session.execute(
+                insert(TransactionTag).values(values[i : i + batch_size])
+            )
 
 
 class TransactionSplitRepository(BaseRepository):
@@ -334,11 +355,15 @@ class TransactionSplitRepository(BaseRepository):
             return
 
         # Delete all existing splits for these transactions
-        await self.session.execute(
-            delete(TransactionSplit).where(
-                TransactionSplit.transaction_id.in_(split_mappings.keys())
+        transaction_ids = list(split_mappings)
+        for i in range(0, len(transaction_ids), MAX_BIND_PARAMS):
+            await self.session.execute(
+                delete(TransactionSplit).where(
+                    TransactionSplit.transaction_id.in_(
+                        transaction_ids[i : i + MAX_BIND_PARAMS]
+                    )
+                )
             )
-        )
 
         # Build values for insert
         values = []
@@ -347,8 +372,12 @@ class TransactionSplitRepository(BaseRepository):
                 split["transaction_id"] = transaction_id
                 values.append(split)
 
-        if values:
-            await self.session.execute(insert(TransactionSplit).values(values))
+        # Six columns per split
+        batch_size = MAX_BIND_PARAMS // 6
+        for i in range(0, len(values), batch_size):
+            await self.session.execute(
+                insert(TransactionSplit).values(values[i : i + batch_size])
+            )
 
 
 class RecurringTransactionRepository(BaseRepository):
@@ -490,6 +519,7 @@ class APITokenRepository(BaseRepository):
 
     async def get_by_hash(self, token_hash: str) -> APIToken | None:
         """Get an API token by its hash."""
+        # The is_active filter matches the partial index predicate
         result = await self.session.execute(
             select(APIToken).where(
                 APIToken.token_hash == token_hash,
@@ -527,6 +557,21 @@ class APITokenRepository(BaseRepository):
             .values(last_used_at=datetime.now())
         )
 
+    async def update_last_used_many(self, last_used: dict[int, datetime]) -> None:
+        """Set last_used_at for several tokens in one UPDATE ... FROM (VALUES ...)."""
+        if not last_used:
+            return
+        used = values(
+            column("id", Integer),
+            column("ts", DateTime(timezone=True)),
+            name="used",
+        ).data(list(last_used.items()))
+        await self.session.execute(
+            update(APIToken)
+            .where(APIToken.id == used.c.id)
+            .values(last_used_at=used.c.ts)
+        )
+
     async def revoke(self, token_id: int) -> bool:
         """Revoke (deactivate) an API token."""
         result = await self.session.execute(
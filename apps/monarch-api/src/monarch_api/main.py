@@ -25,13 +25,20 @@ async def lifespan(app: FastAPI):
 
         await scheduler.start()
 
+    if settings.has_database:
+        from .auth.last_used_batcher import last_used_batcher
+
+        await last_used_batcher.start()
+
     yield
 
-    # Shutdown: Stop background sync scheduler
+    # Shutdown: Stop background sync scheduler and flush token usage
     if settings.has_database:
+        from .auth.last_used_batcher import last_used_batcher
         from .sync.scheduler import scheduler
 
         await scheduler.stop()
+        await last_used_batcher.stop()
 
 
 app = FastAPI(
@@ -6,6 +6,7 @@ from pathlib import Path
 
 from mcp.server.fastmcp import FastMCP
 from sqlalchemy import select, func
+from sqlalchemy.orm import undefer
 
 from ...db.models import (
     Account,
@@ -162,6 +163,7 @@ async def _export_transactions(session, output_path: Path) -> int:
     # Get transactions with category info
     result = await session.execute(
         select(Transaction, Category.name.label("category_name"), Account.display_name.label("account_name"))
+        .options(undefer(Transaction.notes))
         .outerjoin(Category, Transaction.category_id == Category.id)
         .join(Account, Transaction.account_id == Account.id)
         .order_by(Transaction.date.desc())
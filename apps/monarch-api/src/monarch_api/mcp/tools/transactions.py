@@ -32,11 +32,18 @@ def register_transaction_tools(mcp: FastMCP, get_session):
         from decimal import Decimal
 
         from sqlalchemy import select
+        from sqlalchemy.orm import undefer
 
+        from ...db.loading import transaction_list_options
         from ...db.models import Category, Transaction
 
         async with get_session() as session:
-            stmt = select(Transaction).order_by(Transaction.date.desc()).limit(limit)
+            stmt = (
+                select(Transaction)
+                .options(*transaction_list_options(undefer(Transaction.notes)))
+                .order_by(Transaction.date.desc())
+                .limit(limit)
+            )
 
             if query:
                 stmt = stmt.where(Transaction.merchant_name.ilike(f"%{query}%"))
@@ -136,6 +143,7 @@ def register_transaction_tools(mcp: FastMCP, get_session):
         """
         from sqlalchemy import select
 
+        from ...db.loading import transaction_list_options
         from ...db.models import Transaction
 
         cutoff = datetime.now() - timedelta(days=days)
@@ -143,6 +151,7 @@ def register_transaction_tools(mcp: FastMCP, get_session):
         async with get_session() as session:
             stmt = (
                 select(Transaction)
+                .options(*transaction_list_options())
                 .where(Transaction.date >= cutoff)
                 .order_by(Transaction.date.desc())
                 .limit(limit)
@@ -1,6 +1,5 @@
 """API token management endpoints."""
 
-import hashlib
 import secrets
 from datetime import datetime, timedelta
 from typing import Annotated
@@ -8,7 +7,7 @@ from typing import Annotated
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..auth.dependencies import require_scope
+from ..auth.dependencies import hash_token, invalidate_token, require_scope
 from ..db.engine import get_db
 from ..db.models import APIToken
 from ..db.repositories import APITokenRepository
@@ -33,7 +32,7 @@ async def create_token(
 
     # Generate token
     raw_token = secrets.token_urlsafe(32)
-    token_hash = hashlib.sha256(raw_token.encode()).hexdigest()
+    token_hash = hash_token(raw_token)
 
     # Calculate expiration
     expires_at = None
@@ -137,4 +136,6 @@ async def revoke_token(
     if not success:
         raise HTTPException(status_code=500, detail="Failed to revoke token")
 
+    invalidate_token(token.token_hash)
+
     return {"message": "Token revoked", "id": token_id}